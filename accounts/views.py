@@ -4,13 +4,9 @@ from django.contrib.auth.forms import UserCreationForm, AuthenticationForm
 from django.contrib.auth.decorators import login_required
 from django.utils.http import url_has_allowed_host_and_scheme
 from django.conf import settings
-from main.models import Category
 from .forms import UserRegistrationForm
 from django.contrib import messages
 
-def _nav_categories():
-    return Category.objects.filter(is_active=True).order_by("name")
-
 def register_view(request):
     if request.user.is_authenticated:
         return redirect('home')  # змініть на вашу головну
@@ -42,7 +38,6 @@ def login_view(request):
     return render(request, 'accounts/login.html', {
         'form': form,
         'next': next_url,
-        'categories': _nav_categories(),
     })
 
 def logout_view(request):
@@ -61,14 +56,11 @@ def register_view(request):
 
     return render(request, 'accounts/register.html', {
         'form': form,
-        'categories': _nav_categories(),
     })
 
 @login_required
 def profile_view(request):
-    return render(request, 'accounts/profile.html', {
-        'categories': _nav_categories(),
-    })
+    return render(request, 'accounts/profile.html')
 
 
 # --- Middleware захисту /admin/ ---
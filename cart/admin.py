@@ -1,3 +1,23 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import Cart, CartItem
+
+
+class CartItemInline(admin.TabularInline):
+    model = CartItem
+    extra = 0
+    # лише перегляд: змінює кошик сам покупець, інакше розійдеться item_count
+    fields = ('product', 'quantity', 'added_at')
+    readonly_fields = fields
+    can_delete = False
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(Cart)
+class CartAdmin(admin.ModelAdmin):
+    list_display = ('user', 'item_count', 'updated_at')
+    search_fields = ('user__username', 'user__email')
+    readonly_fields = ('item_count', 'created_at', 'updated_at')
+    inlines = (CartItemInline,)
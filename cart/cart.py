@@ -1,88 +1,58 @@
-from decimal import Decimal
-from django.conf import settings
-from main.models import Product
+from main.stock import release_session_reservations
+from .pricing import price_cart
+from .storage import get_storage
+
+
+def cart_count(request):
+    """Кількість одиниць доступних товарів у кошику без переоцінки (для шапки)."""
+    return get_storage(request).count()
 
 
 class Cart:
     def __init__(self, request):
-        self.session = request.session
-        cart = self.session.get(settings.CART_SESSION_ID)
-        if not cart:
-            cart = self.session[settings.CART_SESSION_ID] = {}
-        self.cart = cart
+        # сесія для анонімів, таблиці Cart/CartItem для авторизованих
+        self.request = request
+        self.storage = get_storage(request)
+        self._priced = None
+
+    def _changed(self):
+        self._priced = None
+        # CartCookieMiddleware оновить cookie версії кошика (див. main/conditional.py)
+        self.request.cart_changed = True
+        if self.request.user.is_authenticated:
+            # резерв підтвердження оформлення вже не відповідає кошику
+            release_session_reservations(self.request.session)
+
+    @property
+    def cart(self):
+        return self.storage.items
 
     def add(self, product, quantity=1, override_quantity=False):
-        """
-        Додаємо товар в кошик.
-        Ціна, яка зберігається, вже з урахуванням знижки (якщо є).
-        """
-        product_id = str(product.id)
-
-        # ціна з урахуванням знижки (твій Product вже має ці методи/властивості)
-        try:
-            has_discount = product.has_active_discount
-        except AttributeError:
-            has_discount = False
-
-        if has_discount:
-            unit_price = product.get_discounted_price  # твоя властивість
-        else:
-            unit_price = product.price
-
-        if product_id not in self.cart:
-            self.cart[product_id] = {
-                'quantity': 0,
-                'price': str(unit_price),          # ціна в кошику
-                'original_price': str(product.price),  # для відображення стара ціна
-            }
-
-        if override_quantity:
-            self.cart[product_id]['quantity'] = quantity
-        else:
-            self.cart[product_id]['quantity'] += quantity
-
-        if self.cart[product_id]['quantity'] <= 0:
-            del self.cart[product_id]
-
-        self.save()
-
-    def save(self):
-        self.session.modified = True
+        """Додаємо товар в кошик; зберігається лише кількість, ціни рахує priced()."""
+        self.storage.add(product.id, quantity, override_quantity)
+        self._changed()
 
     def remove(self, product):
-        product_id = str(product.id)
-        if product_id in self.cart:
-            del self.cart[product_id]
-            self.save()
+        self.storage.remove(product.id)
+        self._changed()
 
-    def __iter__(self):
-        """
-        Додаємо в елементи реальний product, перетворюємо ціни в Decimal,
-        рахуємо total_price.
-        """
-        product_ids = self.cart.keys()
-        products = Product.objects.filter(id__in=product_ids)
-        cart = self.cart.copy()
-
-        for product in products:
-            cart[str(product.id)]['product'] = product
+    def priced(self, promo_code=None):
+        """Кошик за поточними цінами та знижками (див. cart.pricing); рахується один раз."""
+        if self._priced is None or self._priced[0] != promo_code:
+            quantities = {key: item['quantity'] for key, item in self.cart.items()}
+            self._priced = (promo_code, price_cart(quantities, promo_code))
+        return self._priced[1]
 
-        for item in cart.values():
-            item['price'] = Decimal(item['price'])
-            if 'original_price' in item:
-                item['original_price'] = Decimal(item['original_price'])
-            item['total_price'] = item['price'] * item['quantity']
-            yield item
+    def __iter__(self):
+        return iter(self.priced())
 
     def __len__(self):
-        return sum(item['quantity'] for item in self.cart.values())
+        # лише доступні товари, як у priced(); позиції від промокоду не залежать
+        return len(self._priced[1] if self._priced else self.priced())
 
     def get_total_price(self):
-        return sum(
-            Decimal(item['price']) * item['quantity']
-            for item in self.cart.values()
-        )
+        return self.priced().total
 
     def clear(self):
-        self.session.pop(settings.CART_SESSION_ID, None)
-        self.save()
+        self.storage.clear()
+        self._changed()
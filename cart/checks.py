@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.core.checks import Warning, register
+from django.utils.module_loading import import_string
+
+# Бекенди, кеш яких не спільний між процесами (або не зберігає нічого)
+LOCAL_CACHE_BACKENDS = {
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+}
+
+
+@register()
+def check_cart_cache(app_configs, **kwargs):
+    """CacheCartStorage потребує кешу, спільного для всіх воркерів."""
+    from .storage import CacheCartStorage
+
+    if not issubclass(import_string(settings.CART_ANONYMOUS_STORAGE), CacheCartStorage):
+        return []
+    backend = settings.CACHES.get(settings.CART_CACHE_ALIAS, {}).get('BACKEND')
+    if backend not in LOCAL_CACHE_BACKENDS:
+        return []
+    return [Warning(
+        f'CART_ANONYMOUS_STORAGE = CacheCartStorage, але кеш "{settings.CART_CACHE_ALIAS}" — {backend}: '
+        'кошики губитимуться між воркерами та після перезапуску.',
+        hint='Вкажіть у CART_CACHE_ALIAS спільний кеш (Redis, Memcached, DatabaseCache).',
+        id='cart.W001',
+    )]
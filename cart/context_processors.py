@@ -1,5 +1,11 @@
-from .cart import Cart
+from django.utils.functional import SimpleLazyObject
+
+from .cart import Cart, cart_count
 
 
 def cart(request):
-    return {'cart': Cart(request)}
+    # сесія читається лише тоді, коли шаблон справді звертається до кошика
+    return {
+        'cart': SimpleLazyObject(lambda: Cart(request)),
+        'cart_count': SimpleLazyObject(lambda: cart_count(request)),
+    }
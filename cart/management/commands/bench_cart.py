@@ -0,0 +1,99 @@
+import statistics
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from main.models import Product
+
+BACKENDS = {
+    'session': 'cart.storage.SessionCartStorage',
+    'cookie': 'cart.storage.CookieCartStorage',
+    'cache': 'cart.storage.CacheCartStorage',
+}
+
+OPERATIONS = ('add', 'view', 'remove')
+
+
+def _percentile(values, percent):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(percent / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def _run(product_ids, rounds, concurrency):
+    """
+    Кожен потік — окремий анонімний відвідувач: додає товар, дивиться кошик,
+    прибирає товар. Повертає {операція: [латентності]}.
+    """
+    def request(client, operation, product_id):
+        if operation == 'add':
+            return client.post(reverse('cart:cart_add', args=[product_id]), {'quantity': 1}), 302
+        if operation == 'remove':
+            return client.post(reverse('cart:cart_remove', args=[product_id])), 302
+        return client.get(reverse('cart:cart_detail')), 200
+
+    def worker(offset):
+        client = Client()
+        latencies = defaultdict(list)
+        for i in range(rounds):
+            product_id = product_ids[(offset + i) % len(product_ids)]
+            for operation in OPERATIONS:
+                started = time.perf_counter()
+                response, expected = request(client, operation, product_id)
+                latencies[operation].append(time.perf_counter() - started)
+                if response.status_code != expected:
+                    raise CommandError(f'{operation} {product_id}: HTTP {response.status_code}')
+        return latencies
+
+    merged = defaultdict(list)
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for latencies in pool.map(worker, range(concurrency)):
+            for operation, values in latencies.items():
+                merged[operation] += values
+    return merged
+
+
+class Command(BaseCommand):
+    help = (
+        "Порівнює пропускну здатність add/view/remove кошика анонімного відвідувача "
+        "для сховищ сесія / підписана cookie / кеш."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rounds', type=int, default=50, help='Циклів add→view→remove на потік.')
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument('--backend', choices=(*BACKENDS, 'all'), default='all')
+
+    def handle(self, *args, **options):
+        product_ids = list(
+            Product.objects.filter(is_available=True).order_by('-views').values_list('id', flat=True)[:20]
+        )
+        if not product_ids:
+            raise CommandError('У каталозі немає доступних товарів.')
+
+        backends = BACKENDS if options['backend'] == 'all' else {options['backend']: BACKENDS[options['backend']]}
+        rounds, concurrency = options['rounds'], options['concurrency']
+        for name, path in backends.items():
+            with override_settings(
+                CART_ANONYMOUS_STORAGE=path, ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+            ):
+                _run(product_ids, 1, 1)  # прогрів
+                started = time.perf_counter()
+                latencies = _run(product_ids, rounds, concurrency)
+                elapsed = time.perf_counter() - started
+            self._report(name, latencies, elapsed)
+
+    def _report(self, name, latencies, elapsed):
+        total = sum(len(values) for values in latencies.values())
+        self.stdout.write(f'{name}: {total} запитів за {elapsed:.2f} с ({total / elapsed:.0f} запитів/с)')
+        for operation in OPERATIONS:
+            ms = [t * 1000 for t in latencies[operation]]
+            self.stdout.write(
+                f'  {operation:<6} p50 {statistics.median(ms):.1f} мс, p99 {_percentile(ms, 99):.1f} мс'
+            )
@@ -0,0 +1,32 @@
+import secrets
+
+from django.conf import settings
+
+from .storage import COOKIE_SALT
+
+
+class CartCookieMiddleware:
+    """
+    Записує cookie кошика, яку змінили CookieCartStorage чи CacheCartStorage під час запиту,
+    і нову версію кошика в CART_VERSION_COOKIE_NAME, якщо кошик змінився.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        value = getattr(request, 'cart_cookie', None)
+        if value:
+            response.set_signed_cookie(
+                settings.CART_COOKIE_NAME, value, salt=COOKIE_SALT,
+                max_age=settings.CART_COOKIE_AGE, httponly=True, samesite='Lax',
+            )
+        elif value is not None and settings.CART_COOKIE_NAME in request.COOKIES:
+            response.delete_cookie(settings.CART_COOKIE_NAME, samesite='Lax')
+        if getattr(request, 'cart_changed', False):
+            response.set_cookie(
+                settings.CART_VERSION_COOKIE_NAME, secrets.token_hex(4),
+                max_age=settings.CART_COOKIE_AGE, httponly=True, samesite='Lax',
+            )
+        return response
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:03
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cart', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='cartitem',
+            name='original_price',
+        ),
+        migrations.RemoveField(
+            model_name='cartitem',
+            name='price',
+        ),
+    ]
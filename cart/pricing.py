@@ -0,0 +1,125 @@
+"""
+Переоцінка кошика на момент перегляду чи оформлення.
+
+price_cart() бере свіжі ціни двома запитами — товари кошика та всі дійсні
+знижки на них — і для кожної позиції застосовує найвигіднішу знижку з
+урахуванням кількості (Discount.calculate_discount, min_quantity), потім
+промокод на суму кошика. Результат — незмінний PricedCart, яким
+користуються кошик, застосування промокоду та оформлення замовлення.
+"""
+from collections import defaultdict
+from dataclasses import dataclass
+from decimal import Decimal
+
+from django.utils import timezone
+
+from discounts.models import Discount, PromoCode
+from discounts.pricing import valid_discounts
+from main.models import Product
+
+ZERO = Decimal('0.00')
+
+
+@dataclass(frozen=True)
+class PricedLine:
+    product: Product
+    quantity: int
+    # ціна за одиницю без знижок
+    original_price: Decimal
+    discount: Discount | None
+    discount_amount: Decimal
+
+    @property
+    def subtotal(self):
+        return self.original_price * self.quantity
+
+    @property
+    def total_price(self):
+        return self.subtotal - self.discount_amount
+
+    @property
+    def price(self):
+        """Ціна за одиницю зі знижкою."""
+        return (self.total_price / self.quantity).quantize(Decimal('0.01'))
+
+
+@dataclass(frozen=True)
+class PricedCart:
+    lines: tuple
+    promo: PromoCode | None = None
+    promo_discount: Decimal = ZERO
+
+    def __iter__(self):
+        return iter(self.lines)
+
+    def __len__(self):
+        return sum(line.quantity for line in self.lines)
+
+    @property
+    def subtotal(self):
+        """Сума без жодних знижок."""
+        return sum((line.subtotal for line in self.lines), ZERO)
+
+    @property
+    def discount_total(self):
+        return sum((line.discount_amount for line in self.lines), ZERO)
+
+    @property
+    def total(self):
+        """Сума зі знижками на товари, до промокоду."""
+        return self.subtotal - self.discount_total
+
+    @property
+    def final_total(self):
+        return max(self.total - self.promo_discount, ZERO)
+
+    @property
+    def promo_code(self):
+        return self.promo.code if self.promo else None
+
+
+def _best_line_discount(price, quantity, discounts):
+    """Найбільша знижка на позицію; при рівності — перша в порядку discounts."""
+    best, best_amount = None, ZERO
+    for discount in discounts:
+        amount = discount.calculate_discount(price, quantity)
+        if amount > best_amount:
+            best, best_amount = discount, amount
+    return best, best_amount
+
+
+def price_lines(quantities, now=None):
+    """
+    quantities — {id товару: кількість}. Повертає кортеж PricedLine у порядку
+    quantities; товари, яких уже немає в каталозі або знятих з продажу, пропускаються.
+    """
+    now = now or timezone.now()
+    ids = [int(pk) for pk in quantities]
+    products = Product.objects.filter(is_available=True).select_related('category').in_bulk(ids)
+    discounts = defaultdict(list)
+    for discount in valid_discounts(now).filter(product_id__in=list(products)):
+        discounts[discount.product_id].append(discount)
+
+    lines = []
+    for pk, quantity in quantities.items():
+        product = products.get(int(pk))
+        if product is None or quantity <= 0:
+            continue
+        discount, amount = _best_line_discount(product.price, quantity, discounts[product.pk])
+        lines.append(PricedLine(product, quantity, product.price, discount, amount))
+    return tuple(lines)
+
+
+def price_cart(quantities, promo_code=None, now=None):
+    """Переоцінює позиції та застосовує промокод; недійсний промокод просто не враховується."""
+    lines = price_lines(quantities, now)
+    priced = PricedCart(lines)
+    if not promo_code:
+        return priced
+    promo = PromoCode.objects.filter(code=promo_code).first()
+    if promo is None:
+        return priced
+    promo_discount = promo.apply_discount(priced.total)
+    if promo_discount <= 0:
+        return priced
+    return PricedCart(lines, promo, promo_discount)
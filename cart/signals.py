@@ -0,0 +1,20 @@
+from django.contrib.auth.signals import user_logged_in
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from main.models import Product
+from .storage import merge_anonymous_cart, refresh_counts
+
+
+@receiver(user_logged_in)
+def merge_cart_on_login(sender, request, user, **kwargs):
+    if request is not None:
+        merge_anonymous_cart(request, user)
+
+
+@receiver(post_save, sender=Product)
+def refresh_cart_counts(sender, instance, created, update_fields=None, **kwargs):
+    # лічильник у шапці рахує лише доступні товари
+    if created or (update_fields is not None and 'is_available' not in update_fields):
+        return
+    refresh_counts(instance.pk)
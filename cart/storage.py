@@ -0,0 +1,237 @@
+"""
+Сховища вмісту кошика для cart.cart.Cart.
+
+Вміст — словник {id товару (str): {'quantity'}}; ціни й суми щоразу
+рахує cart.pricing, тож сховища їх не тримають. count() враховує лише
+доступні товари, як і переоцінений кошик.
+
+Кошик авторизованого користувача живе в таблицях Cart/CartItem: кількість
+змінюється атомарним UPDATE через F(), а сума кількостей доступних товарів
+зберігається в Cart.item_count (оновлюється й при зміні is_available, див. signals). Для анонімів сховище задає CART_ANONYMOUS_STORAGE:
+  SessionCartStorage — у сесії (рядок django_session на кожну зміну);
+  CookieCartStorage — підписана cookie лише з id та кількостями, до CART_COOKIE_MAX_SIZE байт;
+  CacheCartStorage — у кеші CART_CACHE_ALIAS під випадковим токеном з cookie.
+Cookie пише CartCookieMiddleware. При вході анонімний кошик зливається
+у збережений: кількості додаються одним UPDATE через F().
+"""
+import secrets
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import (
+    Case, F, OuterRef, PositiveIntegerField, Subquery, Sum, Value, When,
+)
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from django.utils.functional import cached_property
+from django.utils.module_loading import import_string
+
+from main.models import Product
+from .models import Cart as StoredCart, CartItem
+
+COOKIE_SALT = 'cart.storage'
+
+
+class CartStorageFull(ValueError):
+    pass
+
+
+class AnonymousCartStorage:
+    """Кошик цілим словником: add/remove змінюють items і зберігають його через save()."""
+
+    def add(self, product_id, quantity, override):
+        key = str(product_id)
+        item = self.items.setdefault(key, {'quantity': 0})
+        item['quantity'] = quantity if override else item['quantity'] + quantity
+        if item['quantity'] <= 0:
+            del self.items[key]
+        self.save()
+
+    def remove(self, product_id):
+        if self.items.pop(str(product_id), None) is not None:
+            self.save()
+
+    def count(self):
+        if not self.items:
+            return 0
+        available = Product.objects.filter(
+            pk__in=[int(pk) for pk in self.items], is_available=True,
+        ).values_list('pk', flat=True)
+        return sum(self.items[str(pk)]['quantity'] for pk in available)
+
+
+class SessionCartStorage(AnonymousCartStorage):
+    def __init__(self, request):
+        self.session = request.session
+        self.items = self.session.get(settings.CART_SESSION_ID) or {}
+
+    def clear(self):
+        self.session.pop(settings.CART_SESSION_ID, None)
+        self.items = {}
+
+    def save(self):
+        self.session[settings.CART_SESSION_ID] = self.items
+        self.session.modified = True
+
+
+def _read_cookie(request):
+    return request.get_signed_cookie(settings.CART_COOKIE_NAME, default='', salt=COOKIE_SALT)
+
+
+def _write_cookie(request, value):
+    # значення запише CartCookieMiddleware; '' — видалити cookie
+    request.cart_cookie = value
+
+
+class CookieCartStorage(AnonymousCartStorage):
+    """Вміст у підписаній cookie вигляду "id:кількість|id:кількість"."""
+
+    def __init__(self, request):
+        self.request = request
+        self.items = {}
+        for part in _read_cookie(request).split('|'):
+            product_id, _, quantity = part.partition(':')
+            if product_id.isdigit() and quantity.isdigit():
+                self.items[product_id] = {'quantity': int(quantity)}
+
+    def clear(self):
+        self.items = {}
+        _write_cookie(self.request, '')
+
+    def save(self):
+        value = '|'.join(f'{pk}:{item["quantity"]}' for pk, item in self.items.items())
+        if len(value) > settings.CART_COOKIE_MAX_SIZE:
+            raise CartStorageFull('Кошик переповнений: забагато різних товарів.')
+        _write_cookie(self.request, value)
+
+
+class CacheCartStorage(AnonymousCartStorage):
+    """
+    Вміст у кеші; в cookie лише підписаний випадковий токен кошика.
+    Кеш CART_CACHE_ALIAS має бути спільним для всіх воркерів (перевірка cart.W001).
+    """
+
+    def __init__(self, request):
+        self.request = request
+        self.cache = caches[settings.CART_CACHE_ALIAS]
+        self.token = _read_cookie(request)
+        self.items = (self.cache.get(self.key) if self.token else None) or {}
+
+    @property
+    def key(self):
+        return f'cart:{self.token}'
+
+    def clear(self):
+        if self.token:
+            self.cache.delete(self.key)
+        self.items = {}
+        _write_cookie(self.request, '')
+
+    def save(self):
+        if not self.token:
+            self.token = secrets.token_urlsafe(16)
+        self.cache.set(self.key, self.items, settings.CART_COOKIE_AGE)
+        # оновлюємо cookie, щоб її строк ішов від останньої зміни, як і в кеші
+        _write_cookie(self.request, self.token)
+
+
+def _count_subquery():
+    totals = (
+        CartItem.objects.filter(cart_id=OuterRef('pk'), product__is_available=True)
+        .values('cart_id').annotate(total=Sum('quantity')).values('total')
+    )
+    return Coalesce(Subquery(totals), 0)
+
+
+class DatabaseCartStorage:
+    def __init__(self, request):
+        self.user = request.user
+
+    @cached_property
+    def items(self):
+        rows = CartItem.objects.filter(cart__user=self.user).values_list('product_id', 'quantity')
+        return {str(product_id): {'quantity': quantity} for product_id, quantity in rows}
+
+    @cached_property
+    def cart_id(self):
+        return StoredCart.objects.get_or_create(user=self.user)[0].pk
+
+    def add(self, product_id, quantity, override):
+        with transaction.atomic():
+            if override and quantity <= 0:
+                CartItem.objects.filter(cart_id=self.cart_id, product_id=product_id).delete()
+            else:
+                item, created = CartItem.objects.get_or_create(
+                    cart_id=self.cart_id, product_id=product_id,
+                    defaults={'quantity': quantity},
+                )
+                if not created:
+                    # UPDATE ... SET quantity = quantity + n: паралельні додавання не губляться
+                    new_quantity = quantity if override else F('quantity') + quantity
+                    CartItem.objects.filter(pk=item.pk).update(quantity=new_quantity)
+            self._update_count()
+        self.__dict__.pop('items', None)
+
+    def remove(self, product_id):
+        with transaction.atomic():
+            if CartItem.objects.filter(cart__user=self.user, product_id=product_id).delete()[0]:
+                self._update_count()
+        self.__dict__.pop('items', None)
+
+    def clear(self):
+        with transaction.atomic():
+            CartItem.objects.filter(cart__user=self.user).delete()
+            StoredCart.objects.filter(user=self.user).update(item_count=0, updated_at=timezone.now())
+        self.__dict__['items'] = {}
+
+    def count(self):
+        return StoredCart.objects.filter(user=self.user).values_list('item_count', flat=True).first() or 0
+
+    def _update_count(self):
+        StoredCart.objects.filter(pk=self.cart_id).update(item_count=_count_subquery(), updated_at=timezone.now())
+
+
+def refresh_counts(product_id):
+    """Перераховує item_count кошиків із товаром (після зміни його is_available)."""
+    StoredCart.objects.filter(items__product_id=product_id).update(item_count=_count_subquery())
+
+
+def anonymous_storage(request):
+    return import_string(settings.CART_ANONYMOUS_STORAGE)(request)
+
+
+def get_storage(request):
+    if request.user.is_authenticated:
+        return DatabaseCartStorage(request)
+    return anonymous_storage(request)
+
+
+def merge_anonymous_cart(request, user):
+    """Переносить анонімний кошик у збережений кошик user; кількості однакових товарів додаються."""
+    storage = anonymous_storage(request)
+    items = storage.items
+    if not items:
+        return
+    # товари, видалені з каталогу, пропускаємо (зовнішній ключ)
+    product_ids = list(
+        Product.objects.filter(id__in=[int(pk) for pk in items]).values_list('id', flat=True)
+    )
+    with transaction.atomic():
+        cart, _ = StoredCart.objects.get_or_create(user=user)
+        # спершу рядки для нових товарів (наявні не чіпаються), потім один
+        # UPDATE quantity = quantity + n: паралельні додавання не губляться
+        CartItem.objects.bulk_create(
+            [CartItem(cart=cart, product_id=product_id, quantity=0) for product_id in product_ids],
+            ignore_conflicts=True,
+        )
+        added = Case(
+            *[
+                When(product_id=product_id, then=Value(items[str(product_id)]['quantity']))
+                for product_id in product_ids
+            ],
+            output_field=PositiveIntegerField(),
+        )
+        CartItem.objects.filter(cart=cart, product_id__in=product_ids).update(quantity=F('quantity') + added)
+        StoredCart.objects.filter(pk=cart.pk).update(item_count=_count_subquery(), updated_at=timezone.now())
+    storage.clear()
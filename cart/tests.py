@@ -1,3 +1,122 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from discounts.models import Discount, PromoCode
+from main.models import Category, Product
+from .models import Cart as StoredCart, CartItem
+from .pricing import price_cart
+
+
+def _product(category, i, price='100.00', **kwargs):
+    return Product.objects.create(
+        category=category, name=f'Товар {i}', slug=f'product-{i}', description='-',
+        price=Decimal(price), effective_price=Decimal(price), **kwargs,
+    )
+
+
+class MergeCartTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('buyer', password='secret')
+        category = Category.objects.create(name='Тест', slug='test')
+        cls.products = [_product(category, i) for i in range(3)]
+
+    def _add(self, product, quantity):
+        self.client.post(reverse('cart:cart_add', args=[product.pk]), {'quantity': quantity})
+
+    def _stored(self):
+        return dict(CartItem.objects.filter(cart__user=self.user).values_list('product_id', 'quantity'))
+
+    def test_login_adds_anonymous_quantities(self):
+        first, second, third = self.products
+        self.client.force_login(self.user)
+        self._add(first, 2)
+        self._add(second, 1)
+        self.client.logout()
+
+        self._add(first, 3)
+        self._add(third, 1)
+        self.client.login(username='buyer', password='secret')
+
+        self.assertEqual(self._stored(), {first.pk: 5, second.pk: 1, third.pk: 1})
+        self.assertEqual(StoredCart.objects.get(user=self.user).item_count, 7)
+        self.assertNotIn(settings.CART_SESSION_ID, self.client.session)
+
+    def test_deleted_product_is_skipped(self):
+        gone = self.products[0]
+        self._add(gone, 1)
+        self._add(self.products[1], 2)
+        Product.objects.filter(pk=gone.pk).delete()
+
+        self.client.login(username='buyer', password='secret')
+
+        self.assertEqual(self._stored(), {self.products[1].pk: 2})
+
+    def test_count_skips_unavailable_products(self):
+        self.client.force_login(self.user)
+        self._add(self.products[0], 2)
+        self._add(self.products[1], 1)
+
+        product = self.products[1]
+        product.is_available = False
+        product.save()
+
+        self.assertEqual(StoredCart.objects.get(user=self.user).item_count, 2)
+
+
+class PriceCartTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name='Тест', slug='test')
+        cls.products = [_product(category, i) for i in range(4)]
+        now = timezone.now()
+        period = dict(start_date=now - timedelta(days=1), end_date=now + timedelta(days=1))
+        # від 3 штук — 20%, інакше фіксовані 5 грн
+        Discount.objects.create(
+            product=cls.products[0], discount_type=Discount.DISCOUNT_TYPE_PERCENTAGE,
+            value=Decimal('20'), min_quantity=3, **period,
+        )
+        Discount.objects.create(
+            product=cls.products[0], discount_type=Discount.DISCOUNT_TYPE_FIXED, value=Decimal('5'), **period,
+        )
+        cls.promo = PromoCode.objects.create(
+            code='TEN', discount_type=PromoCode.TYPE_PERCENTAGE, value=Decimal('10'), **period,
+        )
+
+    def test_quantity_tier_picks_best_discount(self):
+        single = price_cart({self.products[0].pk: 1})
+        bulk = price_cart({self.products[0].pk: 3})
+
+        self.assertEqual(single.total, Decimal('95.00'))
+        self.assertEqual(bulk.total, Decimal('240.00'))
+        self.assertEqual(bulk.lines[0].price, Decimal('80.00'))
+
+    def test_promo_applies_to_discounted_total(self):
+        priced = price_cart({self.products[0].pk: 1, self.products[1].pk: 1}, self.promo.code)
+
+        self.assertEqual(priced.total, Decimal('195.00'))
+        self.assertEqual(priced.promo_discount, Decimal('19.50'))
+        self.assertEqual(priced.final_total, Decimal('175.50'))
+        self.assertEqual(price_cart({self.products[1].pk: 1}, 'NOPE').promo, None)
+
+    def test_unavailable_products_are_skipped(self):
+        Product.objects.filter(pk=self.products[1].pk).update(is_available=False)
+
+        priced = price_cart({self.products[0].pk: 1, self.products[1].pk: 2})
+
+        self.assertEqual([line.product.pk for line in priced], [self.products[0].pk])
+        self.assertEqual(len(priced), 1)
 
-# Create your tests here.
+    def test_query_count_does_not_depend_on_lines(self):
+        with CaptureQueriesContext(connection) as queries:
+            price_cart({self.products[0].pk: 1})
+        with self.assertNumQueries(len(queries)):
+            price_cart({product.pk: 2 for product in self.products})
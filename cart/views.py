@@ -1,24 +1,27 @@
-from decimal import Decimal
+from django.contrib import messages
 from django.shortcuts import render, get_object_or_404, redirect
 from django.views.decorators.http import require_POST
 
 from main.models import Product
 from .cart import Cart
 from .forms import CartAddProductForm
-from discounts.models import PromoCode
+from .storage import CartStorageFull
 
 @require_POST
 def cart_add(request, product_id):
     cart = Cart(request)
-    product = get_object_or_404(Product, id=product_id)
+    product = get_object_or_404(Product, id=product_id, is_available=True)
     form = CartAddProductForm(request.POST)
     if form.is_valid():
         cd = form.cleaned_data
-        cart.add(
-            product=product,
-            quantity=cd['quantity'],
-            override_quantity=cd['override'],
-        )
+        try:
+            cart.add(
+                product=product,
+                quantity=cd['quantity'],
+                override_quantity=cd['override'],
+            )
+        except CartStorageFull as e:
+            messages.error(request, str(e))
     return redirect('cart:cart_detail')
 
 
@@ -32,39 +35,24 @@ def cart_remove(request, product_id):
 
 def cart_detail(request):
     cart = Cart(request)
-
-    for item in cart:
-        item['update_quantity_form'] = CartAddProductForm(initial={
-            'quantity': item['quantity'],
-            'override': True,
-        })
-
-    cart_total = cart.get_total_price()
-
     promo_code = request.session.get('promo_code')
-    promo_discount = Decimal('0')
-    final_total = cart_total
-    promo_obj = None
+    priced = cart.priced(promo_code)
 
-    if promo_code:
-        try:
-            promo_obj = PromoCode.objects.get(code=promo_code)
-            promo_discount = promo_obj.apply_discount(cart_total)
-            if promo_discount > 0:
-                final_total = cart_total - promo_discount
-            else:
-                # якщо вже не валідний — прибираємо
-                request.session.pop('promo_code', None)
-                promo_code = None
-        except PromoCode.DoesNotExist:
-            request.session.pop('promo_code', None)
-            promo_code = None
+    if promo_code and priced.promo is None:
+        # якщо вже не валідний — прибираємо
+        request.session.pop('promo_code', None)
+
+    cart_lines = [
+        (line, CartAddProductForm(initial={'quantity': line.quantity, 'override': True}))
+        for line in priced
+    ]
 
     context = {
         'cart': cart,
-        'cart_total': cart_total,
-        'final_total': final_total,
-        'promo_code': promo_code,
-        'promo_discount': promo_discount,
+        'cart_lines': cart_lines,
+        'cart_total': priced.total,
+        'final_total': priced.final_total,
+        'promo_code': priced.promo_code,
+        'promo_discount': priced.promo_discount,
     }
-    return render(request, 'cart/cart_detail.html', context)
\ No newline at end of file
+    return render(request, 'cart/cart_detail.html', context)
@@ -1,7 +1,9 @@
 from django.contrib import admin
 from django.utils.html import format_html
 
+from main.large_admin import LargeTableAdminMixin
 from .models import Discount, PromoCode, PromoCodeUsage
+from .pricing import refresh_products_by_id
 
 
 @admin.register(Discount)
@@ -13,6 +15,7 @@ class DiscountAdmin(admin.ModelAdmin):
     )
     list_filter = ('discount_type', 'is_active', 'start_date')
     search_fields = ('product__name', 'description')
+    autocomplete_fields = ('product',)
     readonly_fields = ('created_at',)
     list_editable = ('is_active',)
     date_hierarchy = 'start_date'
@@ -25,10 +28,12 @@ class DiscountAdmin(admin.ModelAdmin):
     @admin.action(description='Активувати обрані знижки')
     def activate_discounts(self, request, queryset):
         queryset.update(is_active=True)
+        refresh_products_by_id(queryset.values_list('product_id', flat=True))
 
     @admin.action(description='Деактивувати обрані знижки')
     def deactivate_discounts(self, request, queryset):
         queryset.update(is_active=False)
+        refresh_products_by_id(queryset.values_list('product_id', flat=True))
 
 
 @admin.register(PromoCode)
@@ -41,6 +46,7 @@ class PromoCodeAdmin(admin.ModelAdmin):
     list_filter = ('discount_type', 'is_active', 'created_at')
     search_fields = ('code', 'description')
     readonly_fields = ('used_count', 'created_at')
+    autocomplete_fields = ('created_by',)
     fieldsets = (
         ('Основне', {
             'fields': ('code', 'discount_type', 'value', 'description'),
@@ -84,9 +90,12 @@ class PromoCodeAdmin(admin.ModelAdmin):
 
 
 @admin.register(PromoCodeUsage)
-class PromoCodeUsageAdmin(admin.ModelAdmin):
+class PromoCodeUsageAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     list_display = ('promo_code', 'user', 'order_amount', 'discount_amount', 'used_at')
+    # date_hierarchy прибрано: він сканує used_at, щоб побудувати список дат
     list_filter = ('used_at', 'promo_code')
-    search_fields = ('user__username', 'promo_code__code')
+    list_select_related = ('promo_code', 'user')
+    search_fields = ('^promo_code__code', '^user__username')
     readonly_fields = ('promo_code', 'user', 'order_amount', 'discount_amount', 'used_at')
-    date_hierarchy = 'used_at'
+    autocomplete_fields = ('promo_code', 'user')
+    sortable_by = ('used_at', 'order_amount', 'discount_amount')
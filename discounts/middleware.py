@@ -0,0 +1,27 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+
+from .pricing import ensure_fresh_prices
+
+
+class FreshPricesMiddleware:
+    """
+    Перед обробкою запиту перераховує знімки цін, якщо минула межа дії знижки,
+    щоб картки, сортування, фасети, API та фіди не розходилися до запуску cron.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        ensure_fresh_prices()
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        await sync_to_async(ensure_fresh_prices)()
+        return await self.get_response(request)
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:19
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('discounts', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='promocodeusage',
+            index=models.Index(fields=['used_at', 'id'], name='promo_usage_used_at_idx'),
+        ),
+    ]
@@ -1,7 +1,8 @@
 from decimal import Decimal
 
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F, Q
 from django.utils import timezone
 from django.core.exceptions import ValidationError
 
@@ -93,6 +94,10 @@ class Discount(models.Model):
             raise ValidationError(errors)
 
 
+class PromoCodeUnavailable(ValueError):
+    pass
+
+
 class PromoCode(models.Model):
     TYPE_PERCENTAGE = 'percentage'
     TYPE_FIXED = 'fixed'
@@ -160,10 +165,30 @@ class PromoCode(models.Model):
 
         return discount.quantize(Decimal('0.01'))
 
-    def increment_usage(self):
-        # Викликати після успішного замовлення
+    def redeem(self, user, order_amount, discount_amount):
+        """
+        Списує одне використання й записує PromoCodeUsage в одній транзакції.
+        Ліміт і строк дії перевіряє сам UPDATE (used_count = used_count + 1
+        WHERE used_count < usage_limit ...), тож паралельні замовлення не
+        перевищать usage_limit. Якщо код уже недійсний — PromoCodeUnavailable.
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            updated = PromoCode.objects.filter(
+                Q(usage_limit__isnull=True) | Q(used_count__lt=F('usage_limit')),
+                pk=self.pk, is_active=True, start_date__lte=now, end_date__gte=now,
+            ).update(used_count=F('used_count') + 1)
+            if not updated:
+                raise PromoCodeUnavailable(f'Промокод {self.code} більше не діє.')
+            usage = PromoCodeUsage.objects.create(
+                promo_code=self,
+                user=user,
+                order_amount=order_amount,
+                discount_amount=discount_amount,
+            )
+        # без зайвого SELECT: паралельні списання тут не видно, точне значення — в БД
         self.used_count += 1
-        self.save(update_fields=['used_count'])
+        return usage
 
     def clean(self):
         errors = {}
@@ -211,6 +236,8 @@ class PromoCodeUsage(models.Model):
 
     class Meta:
         ordering = ['-used_at']
+        # фільтр за датою та keyset-пагінація changelist в адмінці
+        indexes = [models.Index(fields=['used_at', 'id'], name='promo_usage_used_at_idx')]
         verbose_name = 'Використання промокоду'
         verbose_name_plural = 'Використання промокодів'
 
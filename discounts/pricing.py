@@ -0,0 +1,145 @@
+"""
+Знімок ефективної ціни (Product.effective_price / active_discount) — єдине
+джерело ціни для карток, сортування, фасетів, API та фідів. Знімок
+перераховується сигналами Discount, а коли минає межа дії знижки —
+refresh_due_prices (ensure_fresh_prices з middleware або команда refresh_prices).
+"""
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Case, DecimalField, F, Min, Prefetch, Q, Value, When, prefetch_related_objects
+from django.db.models.functions import Round
+from django.utils import timezone
+
+from main.caching import CATALOG_GENERATION, bump_generation, get_generation
+from main.models import PRICING_FIELDS, Product
+from .models import Discount
+
+
+def valid_discounts(now=None):
+    """Знижки, що діють у момент now."""
+    now = now or timezone.now()
+    return Discount.objects.filter(is_active=True, start_date__lte=now, end_date__gte=now)
+
+
+def attach_active_discounts(products):
+    """
+    Підвантажує знижки зі знімка (active_discount) одним запитом, тож
+    get_active_discount, has_active_discount та get_discount_percentage далі
+    не звертаються до БД. Повертає список товарів.
+    """
+    products = list(products)
+    prefetch_related_objects(products, 'active_discount')
+    return products
+
+
+def refresh_effective_prices(products, now=None):
+    """
+    Перераховує збережену ефективну ціну для набору товарів:
+    один запит за знижками + один bulk_update.
+    """
+    now = now or timezone.now()
+    products = list(products)
+    if not products:
+        return 0
+
+    prefetch_related_objects(products, Prefetch(
+        'discounts',
+        queryset=Discount.objects.filter(is_active=True, end_date__gte=now),
+        to_attr='pricing_discounts',
+    ))
+    for product in products:
+        product.apply_pricing(product.pricing_discounts, now)
+
+    Product.objects.bulk_update(products, PRICING_FIELDS, batch_size=500)
+    bump_generation(CATALOG_GENERATION)
+    return len(products)
+
+
+def refresh_products_by_id(product_ids, now=None):
+    return refresh_effective_prices(Product.objects.filter(id__in=set(product_ids)), now)
+
+
+def refresh_in_batches(queryset, now=None, batch_size=500):
+    """refresh_effective_prices для queryset пакетами по id. Повертає кількість товарів."""
+    now = now or timezone.now()
+    queryset = queryset.order_by('id')
+    total = 0
+    last_id = 0
+    while True:
+        batch = list(queryset.filter(id__gt=last_id)[:batch_size])
+        if not batch:
+            break
+        total += refresh_effective_prices(batch, now)
+        last_id = batch[-1].id
+    return total
+
+
+def refresh_due_prices(now=None, batch_size=500):
+    """Перераховує знімки, у яких минула межа дії знижки (price_valid_until <= now)."""
+    now = now or timezone.now()
+    return refresh_in_batches(Product.objects.filter(price_valid_until__lte=now), now, batch_size)
+
+
+PRICES_VALID_UNTIL_KEY = 'pricing:valid_until'
+PRICES_REFRESH_LOCK_KEY = 'pricing:refresh_lock'
+
+
+def ensure_fresh_prices(now=None):
+    """
+    Перераховує знімки, якщо межу дії якоїсь знижки вже пройдено. Найближча
+    межа кешується під поколінням каталогу, тож зазвичай це один cache.get;
+    перерахунок робить лише один процес (lock у кеші).
+    """
+    now = now or timezone.now()
+    key = f'{PRICES_VALID_UNTIL_KEY}:{get_generation(CATALOG_GENERATION)}'
+    valid_until = cache.get(key)
+    if valid_until is None:
+        valid_until = Product.objects.aggregate(m=Min('price_valid_until'))['m'] or False
+        cache.set(key, valid_until, settings.PAGE_CACHE_TIMEOUT)
+    if not valid_until or valid_until > now:
+        return 0
+    if not cache.add(PRICES_REFRESH_LOCK_KEY, 1, 60):
+        return 0
+    try:
+        return refresh_due_prices(now)
+    finally:
+        cache.delete(PRICES_REFRESH_LOCK_KEY)
+
+
+def adjust_prices(queryset, percent):
+    """
+    Змінює ціни товарів queryset на percent % одним UPDATE. Для товарів без
+    знижок знімок ціни оновлюється в тому ж UPDATE, решта перераховується окремо.
+    Повертає кількість змінених товарів.
+    """
+    factor = (Decimal(100) + Decimal(percent)) / Decimal(100)
+    new_price = Round(
+        F('price') * Value(factor), 2, output_field=DecimalField(max_digits=10, decimal_places=2),
+    )
+    with_discounts = list(
+        queryset.exclude(active_discount__isnull=True, price_valid_until__isnull=True)
+        .values_list('pk', flat=True)
+    )
+    updated = queryset.update(
+        price=new_price,
+        effective_price=Case(
+            When(active_discount__isnull=True, price_valid_until__isnull=True, then=new_price),
+            default=F('effective_price'),
+        ),
+        updated_at=timezone.now(),
+    )
+    refresh_products_by_id(with_discounts)
+    bump_generation(CATALOG_GENERATION)
+    return updated
+
+
+def next_discount_boundary(now=None):
+    """Найближчий момент, коли якась активна знижка почне або перестане діяти (або None)."""
+    now = now or timezone.now()
+    bounds = Discount.objects.filter(is_active=True).aggregate(
+        next_start=Min('start_date', filter=Q(start_date__gt=now)),
+        next_end=Min('end_date', filter=Q(end_date__gte=now)),
+    )
+    return min((b for b in bounds.values() if b is not None), default=None)
@@ -0,0 +1,22 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .models import Discount
+from .pricing import refresh_products_by_id
+
+
+@receiver(pre_save, sender=Discount)
+def remember_product(sender, instance, **kwargs):
+    # знижку могли перенести на інший товар — старому теж треба перерахувати знімок
+    instance._product_before = None
+    if instance.pk is not None:
+        instance._product_before = (
+            Discount.objects.filter(pk=instance.pk).values_list('product_id', flat=True).first()
+        )
+
+
+@receiver(post_save, sender=Discount)
+@receiver(post_delete, sender=Discount)
+def refresh_product_price(sender, instance, **kwargs):
+    product_ids = {instance.product_id, getattr(instance, '_product_before', None)}
+    refresh_products_by_id(product_ids - {None})
@@ -1,3 +1,128 @@
-from django.test import TestCase
+import threading
+from datetime import timedelta
+from decimal import Decimal
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from main.models import Category, Product
+from .models import Discount, PromoCode, PromoCodeUnavailable, PromoCodeUsage
+from .pricing import ensure_fresh_prices
+
+
+class PromoCodeRedeemTests(TransactionTestCase):
+    THREADS = 8
+    ATTEMPTS_PER_THREAD = 10
+    USAGE_LIMIT = 25
+
+    def setUp(self):
+        now = timezone.now()
+        self.promo = PromoCode.objects.create(
+            code='RACE25', discount_type=PromoCode.TYPE_FIXED, value=Decimal('10'),
+            start_date=now - timedelta(days=1), end_date=now + timedelta(days=1),
+            usage_limit=self.USAGE_LIMIT,
+        )
+        self.user = User.objects.create_user('buyer')
+
+    def _redeem_in_threads(self):
+        barrier = threading.Barrier(self.THREADS)
+        results = {'redeemed': 0, 'rejected': 0}
+        lock = threading.Lock()
+
+        def worker():
+            promo = PromoCode.objects.get(pk=self.promo.pk)
+            barrier.wait()
+            try:
+                for _ in range(self.ATTEMPTS_PER_THREAD):
+                    try:
+                        promo.redeem(self.user, Decimal('100'), Decimal('10'))
+                        outcome = 'redeemed'
+                    except PromoCodeUnavailable:
+                        outcome = 'rejected'
+                    with lock:
+                        results[outcome] += 1
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(self.THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_concurrent_redeem_never_exceeds_limit(self):
+        results = self._redeem_in_threads()
+
+        self.promo.refresh_from_db()
+        self.assertEqual(results['redeemed'], self.USAGE_LIMIT)
+        self.assertEqual(results['rejected'], self.THREADS * self.ATTEMPTS_PER_THREAD - self.USAGE_LIMIT)
+        self.assertEqual(self.promo.used_count, self.USAGE_LIMIT)
+        self.assertEqual(PromoCodeUsage.objects.filter(promo_code=self.promo).count(), self.USAGE_LIMIT)
+
+    def test_unlimited_code_counts_every_redeem(self):
+        PromoCode.objects.filter(pk=self.promo.pk).update(usage_limit=None)
+        results = self._redeem_in_threads()
+
+        self.promo.refresh_from_db()
+        total = self.THREADS * self.ATTEMPTS_PER_THREAD
+        self.assertEqual(results['redeemed'], total)
+        self.assertEqual(self.promo.used_count, total)
+        self.assertEqual(PromoCodeUsage.objects.filter(promo_code=self.promo).count(), total)
+
+    def test_expired_code_is_rejected_without_usage(self):
+        PromoCode.objects.filter(pk=self.promo.pk).update(end_date=timezone.now() - timedelta(minutes=1))
+
+        with self.assertRaises(PromoCodeUnavailable):
+            self.promo.redeem(self.user, Decimal('100'), Decimal('10'))
+        self.promo.refresh_from_db()
+        self.assertEqual(self.promo.used_count, 0)
+        self.assertFalse(PromoCodeUsage.objects.exists())
+
+
+class EffectivePriceTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name='Тест', slug='test')
+        cls.first, cls.second = (
+            Product.objects.create(
+                category=category, name=f'Товар {i}', slug=f'product-{i}', description='-',
+                price=Decimal('100.00'),
+            )
+            for i in range(2)
+        )
+
+    def _discount(self, product, **kwargs):
+        now = timezone.now()
+        values = dict(
+            product=product, discount_type=Discount.DISCOUNT_TYPE_PERCENTAGE, value=Decimal('10'),
+            start_date=now - timedelta(days=1), end_date=now + timedelta(days=1),
+        )
+        values.update(kwargs)
+        return Discount.objects.create(**values)
+
+    def test_moving_discount_refreshes_both_products(self):
+        discount = self._discount(self.first)
+        self.first.refresh_from_db()
+        self.assertEqual(self.first.effective_price, Decimal('90.00'))
+
+        discount.product = self.second
+        discount.save()
+
+        self.first.refresh_from_db()
+        self.second.refresh_from_db()
+        self.assertEqual(self.first.effective_price, Decimal('100.00'))
+        self.assertIsNone(self.first.active_discount_id)
+        self.assertEqual(self.second.effective_price, Decimal('90.00'))
+
+    def test_snapshot_refreshes_after_discount_ends(self):
+        self._discount(self.first)
+
+        refreshed = ensure_fresh_prices(timezone.now() + timedelta(days=2))
+
+        self.assertEqual(refreshed, 1)
+        self.first.refresh_from_db()
+        self.assertEqual(self.first.get_discounted_price, Decimal('100.00'))
+        self.assertFalse(self.first.has_active_discount)
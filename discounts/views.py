@@ -146,12 +146,12 @@ def apply_promo_code(request):
             order_amount = Decimal(raw_amount)
         except Exception:
             order_amount = Decimal('0')
+        discount_amount = promo.apply_discount(order_amount)
     else:
-        # 2) інакше вважаємо, що це кошик
-        cart = Cart(request)
-        order_amount = cart.get_total_price()
-
-    discount_amount = promo.apply_discount(order_amount)
+        # 2) інакше вважаємо, що це кошик — за поточними цінами й знижками
+        priced = Cart(request).priced(promo.code)
+        order_amount = priced.total
+        discount_amount = priced.promo_discount
 
     if discount_amount <= 0:
         msg = 'Промокод не може бути застосований до цієї суми замовлення.'
@@ -54,11 +54,41 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'accounts.views.AdminAccessRedirectMiddleware',
+    'cart.middleware.CartCookieMiddleware',
+    'discounts.middleware.FreshPricesMiddleware',
 ]
 
 SESSION_COOKIE_AGE = 86400  # 24 години
 CART_SESSION_ID = 'cart'
 
+# Де зберігається кошик анонімного відвідувача (кошик користувача — завжди в БД):
+# cart.storage.SessionCartStorage, cart.storage.CookieCartStorage або cart.storage.CacheCartStorage
+CART_ANONYMOUS_STORAGE = 'cart.storage.SessionCartStorage'
+# Cookie для CookieCartStorage (вміст) та CacheCartStorage (токен)
+CART_COOKIE_NAME = 'cart'
+CART_COOKIE_AGE = SESSION_COOKIE_AGE
+# Межа розміру вмісту cookie-кошика (до підпису), байт
+CART_COOKIE_MAX_SIZE = 2048
+# Cookie з версією кошика (змінюється при кожній зміні) — для ETag без читання сесії
+CART_VERSION_COOKIE_NAME = 'cart_version'
+# Кеш для CacheCartStorage — має бути спільним для всіх воркерів (Redis, Memcached,
+# DatabaseCache); LocMemCache у кожного процесу свій, див. перевірку cart.W001
+CART_CACHE_ALIAS = 'default'
+
+# Скільки секунд товар лишається відкладеним під оформлення (main/stock.py)
+STOCK_RESERVATION_TTL = 15 * 60
+# id резервів кроку підтвердження оформлення в сесії покупця
+STOCK_RESERVATIONS_SESSION_ID = 'stock_reservations'
+
+# Keyset-пагінація каталогу (?cursor=...) замість номерів сторінок
+CATALOG_CURSOR_PAGINATION = False
+
+# Async-версії сторінок каталогу й товару (main/async_views.py) — для запуску під ASGI
+CATALOG_ASYNC_VIEWS = False
+
+# Як часто (сек) буфер переглядів товарів скидається в БД; 0 — одразу
+VIEW_COUNT_FLUSH_INTERVAL = 10
+
 CKEDITOR_UPLOAD_PATH = "uploads/"
 CKEDITOR_IMAGE_BACKEND = "pillow"
 
@@ -85,6 +115,7 @@ TEMPLATES = [
                 'django.contrib.messages.context_processors.messages',
                 "django.template.context_processors.static",
                 'cart.context_processors.cart',
+                'main.context_processors.navigation',
             ],
         },
     },
@@ -99,9 +130,37 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            # транзакція одразу бере блокування запису, а паралельні чекають до timeout секунд
+            # замість "database is locked" при спробі підвищити блокування посеред транзакції
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 20,
+        },
+        # тестова БД у файлі: in-memory БД не дає потокам чекати блокування (discounts.tests)
+        'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
     }
 }
 
+# Cache
+# LocMemCache — окремий для кожного процесу; для кількох воркерів
+# потрібен спільний бекенд (Redis/Memcached), інакше інвалідація не поширюється.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'homework6',
+    }
+}
+
+# Кеш сторінок каталогу для анонімних відвідувачів (сек)
+PAGE_CACHE_TIMEOUT = 300
+
+# Кеш HTML-фрагментів карток товарів (сек); обмежує застарівання "час тому" та переглядів
+CARD_CACHE_TIMEOUT = 300
+
+# Каталог для згенерованих sitemap і фідів для маркетплейсів; None — без кешу на диску
+FEED_CACHE_DIR = BASE_DIR / 'feed_cache'
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
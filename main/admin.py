@@ -1,7 +1,26 @@
 # main/admin.py
-from django.contrib import admin
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ActionForm
+from django.core.exceptions import ValidationError
 from django.utils.html import format_html
-from .models import Category, Product
+
+from discounts.pricing import adjust_prices
+from .images import image_variants
+from .large_admin import LargeTableAdminMixin
+from .models import Category, Product, StockReservation
+
+
+def admin_thumbnail(image):
+    if not image:
+        return "—"
+    # найменший WebP-варіант замість оригіналу на кілька мегабайт
+    variants = image_variants(image)
+    url = next(iter(variants.values()), image.url)
+    return format_html(
+        '<img src="{}" style="height:40px;width:40px;object-fit:cover;border-radius:6px;" />',
+        url,
+    )
 
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
@@ -13,21 +32,26 @@ class CategoryAdmin(admin.ModelAdmin):
 
     @admin.display(description="Зображення")
     def image_tag(self, obj):
-        if obj.image:
-            return format_html(
-                '<img src="{}" style="height:40px;width:40px;object-fit:cover;border-radius:6px;" />',
-                obj.image.url,
-            )
-        return "—"
+        return admin_thumbnail(obj.image)
+
+class PriceAdjustActionForm(ActionForm):
+    percent = forms.DecimalField(
+        label="Відсоток", required=False, max_digits=6, decimal_places=2,
+        min_value=-99, max_value=1000,
+    )
 
 @admin.register(Product)
-class ProductAdmin(admin.ModelAdmin):
-    list_display = ("id","name","category","price","is_available","featured","views","image_tag")
+class ProductAdmin(LargeTableAdminMixin, admin.ModelAdmin):
+    list_display = ("id","name","category","price","stock","is_available","featured","views","image_tag")
     list_filter = ("category","is_available","featured","created_at")
-    search_fields = ("name","description")
+    # пошук за префіксом назви (індекс product_name_prefix_idx) або точним slug
+    search_fields = ("^name","slug__exact")
     prepopulated_fields = {"slug": ("name",)}
-    list_editable = ("price","is_available","featured")
+    list_editable = ("price","stock","is_available","featured")
     ordering = ("-created_at",)
+    sortable_by = ("id","name","price","views")
+    action_form = PriceAdjustActionForm
+    actions = ("adjust_price",)
 
     fieldsets = (
         ("Основна інформація", {
@@ -40,7 +64,7 @@ class ProductAdmin(admin.ModelAdmin):
             "fields": ("price",)
         }),
         ("Налаштування", {
-            "fields": ("is_available","featured","views")
+            "fields": ("is_available","stock","featured","views")
         }),
     )
 
@@ -50,9 +74,31 @@ class ProductAdmin(admin.ModelAdmin):
 
     @admin.display(description="Зображення")
     def image_tag(self, obj):
-        if obj.image:
-            return format_html(
-                '<img src="{}" style="height:40px;width:40px;object-fit:cover;border-radius:6px;" />',
-                obj.image.url,
-            )
-        return "—"
+        return admin_thumbnail(obj.image)
+
+    @admin.action(description="Змінити ціну на вказаний відсоток")
+    def adjust_price(self, request, queryset):
+        try:
+            percent = PriceAdjustActionForm.base_fields["percent"].clean(request.POST.get("percent"))
+        except ValidationError:
+            percent = None
+        if not percent:
+            self.message_user(request, "Вкажіть відсоток від -99 до 1000.", messages.ERROR)
+            return
+        updated = adjust_prices(queryset, percent)
+        self.message_user(request, f"Ціну змінено на {percent}% для {updated} товарів.")
+
+
+@admin.register(StockReservation)
+class StockReservationAdmin(admin.ModelAdmin):
+    list_display = ("product","user","quantity","expires_at","created_at")
+    list_select_related = ("product","user")
+    ordering = ("expires_at",)
+    # залишок уже списаний під резерв — правка тут розсинхронізувала б Product.stock
+    readonly_fields = ("product","user","quantity","expires_at","created_at")
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
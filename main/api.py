@@ -0,0 +1,187 @@
+"""
+Read-only JSON API каталогу.
+
+Дані вибираються через values() (без створення моделей), поля можна
+обмежити ?fields=, список товарів пагінується курсором як і каталог,
+а ?format=ndjson віддає всю вибірку потоково рядок за рядком.
+Фільтрація та сортування — ті самі, що на сторінках (main.catalog).
+"""
+import hashlib
+import json
+
+from django.core.files.storage import default_storage
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils import timezone
+from django.views.decorators.http import condition, require_GET
+
+from discounts.pricing import valid_discounts
+from .caching import CATALOG_GENERATION, NAV_GENERATION, get_generation
+from .catalog import catalog_products
+from .conditional import product_state
+from .models import Category, Product
+from .navigation import nav_categories
+from .page_cache import next_boundary
+from .pagination import paginate_by_cursor
+
+DEFAULT_LIMIT = 24
+MAX_LIMIT = 100
+NDJSON_CHUNK_SIZE = 2000
+
+# Поле API -> поле для values()
+PRODUCT_FIELDS = {
+    'id': 'id',
+    'name': 'name',
+    'slug': 'slug',
+    'description': 'description',
+    'category': 'category__slug',
+    'price': 'price',
+    'effective_price': 'effective_price',
+    'discount_id': 'active_discount_id',
+    'image': 'image',
+    'rating_avg': 'rating_avg',
+    'rating_count': 'rating_count',
+    'views': 'views',
+    'created_at': 'created_at',
+    'updated_at': 'updated_at',
+}
+# Обчислювані поля та поля values(), від яких вони залежать
+COMPUTED_FIELDS = {
+    'url': ('id', 'slug'),
+}
+DEFAULT_PRODUCT_FIELDS = ('id', 'name', 'slug', 'category', 'price', 'effective_price', 'image', 'url')
+DETAIL_EXTRA_FIELDS = ('description', 'rating_avg', 'rating_count', 'discount_id', 'updated_at')
+
+
+def _requested_fields(request, default):
+    raw = request.GET.get('fields')
+    if not raw:
+        return list(default)
+    allowed = PRODUCT_FIELDS.keys() | COMPUTED_FIELDS.keys()
+    fields = [f for f in (part.strip() for part in raw.split(',')) if f in allowed]
+    return fields or list(default)
+
+
+def _projection(fields, extra=()):
+    """Поля values() для набору полів API (+ службові extra, напр. для курсора)."""
+    columns = []
+    for name in fields:
+        sources = COMPUTED_FIELDS.get(name, (name,))
+        columns += [PRODUCT_FIELDS[src] for src in sources]
+    columns += list(extra)
+    return list(dict.fromkeys(columns))
+
+
+def _serialize(row, fields):
+    item = {}
+    for name in fields:
+        if name == 'url':
+            item[name] = reverse('main:product_detail', args=[row['id'], row['slug']])
+        elif name == 'image':
+            image = row['image']
+            item[name] = default_storage.url(image) if image else None
+        else:
+            item[name] = row[PRODUCT_FIELDS[name]]
+    return item
+
+
+def _catalog_etag(request, *args, **kwargs):
+    boundary = next_boundary()
+    parts = [
+        request.path, request.GET.urlencode(),
+        get_generation(CATALOG_GENERATION), get_generation(NAV_GENERATION),
+        boundary.isoformat() if boundary else '',
+    ]
+    return hashlib.md5('|'.join(str(p) for p in parts).encode()).hexdigest()
+
+
+def _product_etag(request, id):
+    state = product_state(request, id=id)
+    if state is None:
+        return None
+    valid_until = state['price_valid_until']
+    pricing_stale = valid_until is not None and valid_until <= timezone.now()
+    parts = [id, request.GET.urlencode(), *state.values(), pricing_stale]
+    return hashlib.md5('|'.join(str(p) for p in parts).encode()).hexdigest()
+
+
+def _limit(request):
+    try:
+        return max(1, min(int(request.GET.get('limit', DEFAULT_LIMIT)), MAX_LIMIT))
+    except ValueError:
+        return DEFAULT_LIMIT
+
+
+def _ndjson(rows, fields):
+    for row in rows:
+        yield json.dumps(_serialize(row, fields), cls=DjangoJSONEncoder, ensure_ascii=False) + '\n'
+
+
+@require_GET
+@condition(etag_func=_catalog_etag)
+def product_list(request):
+    category = None
+    if request.GET.get('category'):
+        category = get_object_or_404(Category, slug=request.GET['category'], is_active=True)
+
+    products, current_sort, ordering = catalog_products(request.GET, category)
+    fields = _requested_fields(request, DEFAULT_PRODUCT_FIELDS)
+
+    if request.GET.get('format') == 'ndjson':
+        rows = products.values(*_projection(fields)).iterator(chunk_size=NDJSON_CHUNK_SIZE)
+        return StreamingHttpResponse(_ndjson(rows, fields), content_type='application/x-ndjson')
+
+    limit = _limit(request)
+    if ordering:
+        sort_field = ordering.lstrip('-')
+        rows = products.values(*_projection(fields, extra=('id', sort_field)))
+        page = paginate_by_cursor(rows, ordering, request.GET.get('cursor'), limit)
+        results, next_cursor, previous_cursor = page.object_list, page.next_cursor, page.previous_cursor
+    else:
+        # релевантність: курсор — зсув у списку результатів пошуку
+        try:
+            offset = max(0, int(request.GET.get('cursor') or 0))
+        except ValueError:
+            offset = 0
+        rows = list(products.values(*_projection(fields))[offset:offset + limit + 1])
+        results = rows[:limit]
+        next_cursor = str(offset + limit) if len(rows) > limit else None
+        previous_cursor = str(max(0, offset - limit)) if offset else None
+
+    return JsonResponse({
+        'sort': current_sort,
+        'results': [_serialize(row, fields) for row in results],
+        'next': next_cursor,
+        'previous': previous_cursor,
+    }, json_dumps_params={'ensure_ascii': False})
+
+
+@require_GET
+@condition(etag_func=_product_etag)
+def product_detail(request, id):
+    fields = _requested_fields(request, DEFAULT_PRODUCT_FIELDS + DETAIL_EXTRA_FIELDS)
+    row = Product.objects.filter(id=id, is_available=True).values(*_projection(fields)).first()
+    if row is None:
+        raise Http404
+    return JsonResponse(_serialize(row, fields), json_dumps_params={'ensure_ascii': False})
+
+
+@require_GET
+@condition(etag_func=_catalog_etag)
+def category_list(request):
+    results = [
+        {'id': c.pk, 'name': c.name, 'slug': c.slug, 'url': c.get_absolute_url()}
+        for c in nav_categories()
+    ]
+    return JsonResponse({'results': results}, json_dumps_params={'ensure_ascii': False})
+
+
+@require_GET
+@condition(etag_func=_catalog_etag)
+def discount_list(request):
+    rows = valid_discounts().filter(product__is_available=True).values(
+        'id', 'product_id', 'discount_type', 'value', 'min_quantity', 'start_date', 'end_date',
+    )
+    return JsonResponse({'results': list(rows)}, json_dumps_params={'ensure_ascii': False})
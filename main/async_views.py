@@ -0,0 +1,96 @@
+"""
+Async-версії product_list і product_detail для розгортання під ASGI
+(вмикаються CATALOG_ASYNC_VIEWS, див. main/urls.py).
+
+Async ORM Django виконує всі запити одного запиту послідовно в одному
+потоці, тому незалежні частини сторінки (фасети й сторінка товарів;
+схожі товари, відгуки та знижка товару) запускаються через in_thread()
+в окремих потоках зі своїми з'єднаннями й чекаються разом asyncio.gather.
+Рендер шаблонів (контекст-процесори читають сесію й користувача) — в sync_to_async.
+"""
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+from django.shortcuts import aget_object_or_404, render
+
+from cart.forms import CartAddProductForm
+from discounts.pricing import attach_active_discounts
+from .catalog import (
+    base_products, catalog_page, product_detail_context, product_reviews, related_for,
+)
+from .conditional import (
+    conditional_page, product_detail_etag, product_list_etag,
+)
+from .facets import build_facets, facet_counts, facet_query, selected_facets
+from .models import Category, Product
+from .page_cache import cache_anonymous_page
+from .view_counter import pending_views, record_view
+
+arender = sync_to_async(render)
+
+
+def _call_with_connection(func, args, kwargs):
+    # потік пулу має власне з'єднання, і request_finished його не закриває:
+    # як і для звичайного запиту, прибираємо зламані та прострочені (CONN_MAX_AGE) до й після
+    close_old_connections()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+async def in_thread(func, *args, **kwargs):
+    """Виконує синхронну функцію із запитами до БД в окремому потоці пулу."""
+    return await sync_to_async(_call_with_connection, thread_sensitive=False)(func, args, kwargs)
+
+
+def _related_with_discounts(product):
+    return attach_active_discounts(related_for(product))
+
+
+@conditional_page(product_list_etag)
+@cache_anonymous_page("product_list")
+async def product_list(request, category_slug=None):
+    category = None
+    search_query = request.GET.get("q", "").strip()
+    products = base_products(search_query)
+
+    if category_slug:
+        category = await aget_object_or_404(Category, slug=category_slug, is_active=True)
+
+    selected = selected_facets(request.GET)
+    counts, (products_page, current_sort) = await asyncio.gather(
+        in_thread(facet_counts, products, category, search_query),
+        in_thread(catalog_page, request.GET, products, category, selected, search_query),
+    )
+
+    return await arender(request, "main/product_list.html", {
+        "products": products_page,
+        "category": category,
+        "current_sort": current_sort,
+        "search_query": search_query,
+        "facets": build_facets(request.GET, counts, selected),
+        "facet_query": facet_query(request.GET),
+    })
+
+
+@conditional_page(product_detail_etag)
+async def product_detail(request, id, slug):
+    product = await aget_object_or_404(
+        Product.objects.select_related("category"), id=id, slug=slug, is_available=True,
+    )
+
+    # з VIEW_COUNT_FLUSH_INTERVAL=0 record_view пише в БД одразу
+    await in_thread(record_view, product.pk)
+    product.views += pending_views(product.pk)
+
+    user, related_products, reviews, _ = await asyncio.gather(
+        request.auser(),
+        in_thread(_related_with_discounts, product),
+        in_thread(product_reviews, product),
+        in_thread(attach_active_discounts, [product]),
+    )
+    context = product_detail_context(product, related_products, reviews, user)
+    context["cart_product_form"] = CartAddProductForm()
+    return await arender(request, 'main/product_detail.html', context)
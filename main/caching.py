@@ -0,0 +1,49 @@
+"""
+Лічильники поколінь (generation counters) для інвалідації кешу.
+
+Ключі кешу містять номер покоління; при зміні даних покоління збільшується,
+і старі записи просто перестають читатися та витісняються за TTL.
+"""
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+# Категорії в навігації
+NAV_GENERATION = 'categories'
+# Будь-які зміни товарів/категорій, що впливають на каталог
+CATALOG_GENERATION = 'catalog'
+
+
+def _key(name):
+    return f'generation:{name}'
+
+
+def _initial_value():
+    # Стартуємо з часу, а не з 1, щоб після витіснення лічильника не повторити старе значення
+    return int(time.time() * 1000)
+
+
+def get_generation(name):
+    value = cache.get(_key(name))
+    if value is None:
+        cache.add(_key(name), _initial_value(), None)
+        value = cache.get(_key(name), _initial_value())
+    return value
+
+
+def bump_generation(*names):
+    for name in names:
+        try:
+            cache.incr(_key(name))
+        except ValueError:
+            cache.set(_key(name), _initial_value(), None)
+
+
+def bump_generation_on_commit(*names):
+    """
+    bump_generation після коміту поточної транзакції (без транзакції — одразу):
+    інакше паралельний запит перебудує кеш під новим поколінням зі старих даних,
+    а відкочена зміна все одно скине кеш.
+    """
+    transaction.on_commit(lambda: bump_generation(*names))
@@ -0,0 +1,114 @@
+"""
+Спільна логіка вибірки каталогу для HTML-сторінок (main.views, main.async_views)
+та JSON API (main.api): доступні товари, пошук, категорія, фасети, сортування,
+сторінка списку й дані сторінки товару.
+"""
+from django.conf import settings
+from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
+from django.db.models import Q
+
+from discounts.pricing import attach_active_discounts
+from orders.recommendations import RELATED_LIMIT, related_products as co_purchased_products
+from .facets import apply_facets, selected_facets
+from .models import Product
+from .pagination import paginate_by_cursor
+from .search import order_by_relevance, search_products
+
+PER_PAGE = 6
+
+SORT_MAP = {
+    "new": "-created_at",
+    "old": "created_at",
+    "popular": "-views",
+    "price_low": "effective_price",
+    "price_high": "-effective_price",
+    "name": "name",
+}
+
+# Сортування за релевантністю доступне лише разом із пошуковим запитом
+RELEVANCE_SORT = "relevance"
+
+
+def base_products(search_query=""):
+    """Доступні товари з урахуванням пошуку (база для підрахунку фасетів)."""
+    # наявність — за лічильником залишку, без підрахунку резервів
+    products = Product.objects.filter(Q(stock__isnull=True) | Q(stock__gt=0), is_available=True)
+    if search_query:
+        products = search_products(products, search_query)
+    return products
+
+
+def filter_products(products, category=None, selected=None):
+    if category:
+        products = products.filter(category=category)
+    return apply_facets(products, selected or {})
+
+
+def sort_products(products, sort=None, search_query=""):
+    """
+    Повертає (queryset, current_sort, ordering). ordering — поле для
+    keyset-пагінації або None для сортування за релевантністю.
+    """
+    current_sort = sort or (RELEVANCE_SORT if search_query else "new")
+    if current_sort == RELEVANCE_SORT and search_query:
+        return order_by_relevance(products), current_sort, None
+    ordering = SORT_MAP.get(current_sort, "-created_at")
+    return products.order_by(ordering), current_sort, ordering
+
+
+def catalog_products(params, category=None):
+    """Повний ланцюжок для GET-параметрів: (queryset, current_sort, ordering)."""
+    search_query = params.get("q", "").strip()
+    products = filter_products(base_products(search_query), category, selected_facets(params))
+    return sort_products(products, params.get("sort"), search_query)
+
+
+def catalog_page(params, products, category=None, selected=None, search_query=""):
+    """
+    Фільтрує, сортує й пагінує базовий набір товарів; знижки підвантажуються
+    лише для товарів сторінки. Повертає (page, current_sort).
+    """
+    products = filter_products(products, category, selected)
+    products, current_sort, ordering = sort_products(products, params.get("sort"), search_query)
+
+    if ordering and settings.CATALOG_CURSOR_PAGINATION:
+        # keyset-пагінація: без OFFSET і без COUNT(*)
+        page = paginate_by_cursor(products, ordering, params.get("cursor"), PER_PAGE)
+    else:
+        paginator = Paginator(products, PER_PAGE)
+        try:
+            page = paginator.page(params.get("page", 1))
+        except PageNotAnInteger:
+            page = paginator.page(1)
+        except EmptyPage:
+            page = paginator.page(paginator.num_pages)
+    page.object_list = attach_active_discounts(page.object_list)
+    return page, current_sort
+
+
+def related_for(product):
+    """"Разом з цим купують", інакше — новинки з тієї ж категорії."""
+    return co_purchased_products(product) or list(
+        Product.objects.filter(is_available=True, category=product.category_id)
+        .exclude(id=product.id)
+        .order_by("-created_at")[:RELATED_LIMIT]
+    )
+
+
+def product_reviews(product):
+    return list(product.reviews.filter(is_active=True).select_related("author"))
+
+
+def product_detail_context(product, related_products, reviews, user):
+    user_review = None
+    if user.is_authenticated:
+        user_review = next((r for r in reviews if r.author_id == user.pk), None)
+    return {
+        "product": product,
+        "related_products": related_products,
+        "reviews": reviews,
+        "reviews_count": product.get_reviews_count(),
+        "average_rating": product.get_average_rating(),
+        "rating_distribution": product.get_rating_distribution(),
+        "user_review": user_review,
+    }
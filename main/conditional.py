@@ -0,0 +1,124 @@
+"""
+Валідатори для умовних GET (ETag) сторінок каталогу й товару.
+
+Валідатор рахується до view: для списку — з лічильників поколінь у кеші
+(0 запитів), для товару — одним запитом за первинним ключем. Якщо клієнт
+надіслав збіжний If-None-Match, відповідаємо 304 без рендеру шаблонів.
+Сторінки містять шапку з користувачем і кошиком, тому до ETag входять
+id користувача та версія кошика з cookie (без читання сесії чи кошика з БД),
+а відповідь — private і Vary: Cookie.
+Last-Modified не віддаємо: знімок ціни (refresh_effective_prices) оновлюється
+bulk_update без updated_at, тож If-Modified-Since давав би 304 зі старою ціною.
+"""
+import hashlib
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.db.models import Max, OuterRef, Subquery
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.views.decorators.http import condition
+
+from reviews.models import Review
+from .caching import CATALOG_GENERATION, NAV_GENERATION, get_generation
+from .models import Product
+from .page_cache import next_boundary
+
+
+def _visitor_parts(request):
+    """Частини ETag, що залежать від відвідувача; None — сторінку треба рендерити."""
+    if len(get_messages(request)):
+        return None
+    return [request.user.pk or 0, request.COOKIES.get(settings.CART_VERSION_COOKIE_NAME, '')]
+
+
+def _hash(parts):
+    return hashlib.md5('|'.join(str(p) for p in parts).encode()).hexdigest()
+
+
+def product_list_etag(request, category_slug=None):
+    visitor = _visitor_parts(request)
+    if visitor is None:
+        return None
+    boundary = next_boundary()
+    return _hash([
+        'list', category_slug, request.GET.urlencode(),
+        get_generation(CATALOG_GENERATION), get_generation(NAV_GENERATION),
+        boundary.isoformat() if boundary else '', *visitor,
+    ])
+
+
+def product_state(request, **lookup):
+    """Стан товару для валідаторів — один запит; кешується на request."""
+    cache_attr = '_product_state'
+    if not hasattr(request, cache_attr):
+        last_review = (
+            Review.objects.filter(product=OuterRef('pk'))
+            .order_by().values('product').annotate(m=Max('updated_at')).values('m')
+        )
+        state = (
+            Product.objects.filter(is_available=True, **lookup)
+            .values(
+                'updated_at', 'effective_price', 'active_discount_id', 'price_valid_until',
+                'category_id', 'rating_count', 'rating_avg',
+            )
+            .annotate(last_review=Subquery(last_review))
+            .first()
+        )
+        setattr(request, cache_attr, state)
+    return getattr(request, cache_attr)
+
+
+def product_detail_etag(request, id, slug):
+    state = product_state(request, id=id, slug=slug)
+    visitor = _visitor_parts(request)
+    if state is None or visitor is None:
+        return None
+    # сторінка показує й схожі товари з їхніми цінами — тому покоління каталогу
+    # та найближча межа дії знижок, як і для списку
+    boundary = next_boundary()
+    return _hash([
+        'detail', id, *state.values(),
+        get_generation(CATALOG_GENERATION), get_generation(NAV_GENERATION),
+        boundary.isoformat() if boundary else '', *visitor,
+    ])
+
+
+def _private(response):
+    if response.has_header('ETag'):
+        patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ('Cookie',))
+    return response
+
+
+def conditional_page(etag_func, last_modified_func=None):
+    """condition() + private/no-cache, щоб браузер щоразу перевіряв валідатор."""
+    def decorator(view):
+        if iscoroutinefunction(view):
+            # condition() викликає валідатори синхронно, а вони ходять у БД (сесія,
+            # стан товару) — тож для async-view рахуємо їх заздалегідь у потоці
+            def validators(request, *args, **kwargs):
+                return (
+                    etag_func(request, *args, **kwargs),
+                    last_modified_func(request, *args, **kwargs) if last_modified_func else None,
+                )
+
+            conditional_view = condition(
+                etag_func=lambda request, *args, **kwargs: request._page_validators[0],
+                last_modified_func=lambda request, *args, **kwargs: request._page_validators[1],
+            )(view)
+
+            @wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                request._page_validators = await sync_to_async(validators)(request, *args, **kwargs)
+                return _private(await conditional_view(request, *args, **kwargs))
+            return async_wrapper
+
+        conditional_view = condition(etag_func=etag_func, last_modified_func=last_modified_func)(view)
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            return _private(conditional_view(request, *args, **kwargs))
+        return wrapper
+    return decorator
@@ -0,0 +1,8 @@
+from django.utils.functional import SimpleLazyObject
+
+from .navigation import nav_categories
+
+
+def navigation(request):
+    # Лінива обгортка: кеш читається лише якщо шаблон справді виводить меню
+    return {'categories': SimpleLazyObject(nav_categories)}
@@ -0,0 +1,144 @@
+"""
+Фасетні фільтри каталогу: ціна, "зі знижкою", мінімальний рейтинг, категорія.
+
+Кількості для всіх значень фасетів рахуються одним агрегатним запитом
+(Count з filter=) над базовим набором (доступні товари + пошук) і кешуються
+для цього набору до зміни покоління каталогу.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, F, Q
+
+from .caching import CATALOG_GENERATION, get_generation
+from .navigation import nav_categories
+
+# (ключ у URL, підпис, умова) — за ефективною ціною (з урахуванням знижки)
+PRICE_RANGES = (
+    ('0-500', 'до 500 грн', Q(effective_price__lt=500)),
+    ('500-1000', '500–1000 грн', Q(effective_price__gte=500, effective_price__lt=1000)),
+    ('1000-5000', '1000–5000 грн', Q(effective_price__gte=1000, effective_price__lt=5000)),
+    ('5000-', 'від 5000 грн', Q(effective_price__gte=5000)),
+)
+ON_SALE = Q(effective_price__lt=F('price'))
+MIN_RATINGS = (4, 3, 2, 1)
+
+# GET-параметри фасетів (зберігаються в посиланнях пагінації та сортування)
+FACET_PARAMS = ('price', 'on_sale', 'min_rating')
+
+
+def selected_facets(params):
+    """Розбирає GET-параметри у {назва: значення}, ігноруючи некоректні."""
+    selected = {}
+    price = params.get('price')
+    if price in {key for key, _, _ in PRICE_RANGES}:
+        selected['price'] = price
+    if params.get('on_sale') == '1':
+        selected['on_sale'] = '1'
+    try:
+        rating = int(params.get('min_rating', ''))
+    except ValueError:
+        rating = None
+    if rating in MIN_RATINGS:
+        selected['min_rating'] = rating
+    return selected
+
+
+def apply_facets(queryset, selected):
+    if 'price' in selected:
+        queryset = queryset.filter(next(q for key, _, q in PRICE_RANGES if key == selected['price']))
+    if 'on_sale' in selected:
+        queryset = queryset.filter(ON_SALE)
+    if 'min_rating' in selected:
+        queryset = queryset.filter(rating_avg__gte=selected['min_rating'])
+    return queryset
+
+
+def facet_counts(base, category=None, search_query=''):
+    """
+    Кількості для всіх фасетів одним запитом. base — доступні товари з пошуком,
+    але без категорії: кількості по категоріях рахуються по всьому base,
+    решта — в межах поточної категорії.
+    """
+    key = 'facets:{}:{}'.format(
+        get_generation(CATALOG_GENERATION),
+        hashlib.md5(f'{category.pk if category else ""}|{search_query}'.encode()).hexdigest(),
+    )
+    counts = cache.get(key)
+    if counts is not None:
+        return counts
+
+    scope = Q(category=category) if category else Q()
+    aggregates = {'total': Count('id', filter=scope)}
+    for index, (_, _, condition) in enumerate(PRICE_RANGES):
+        aggregates[f'price_{index}'] = Count('id', filter=scope & condition)
+    aggregates['on_sale'] = Count('id', filter=scope & ON_SALE)
+    for rating in MIN_RATINGS:
+        aggregates[f'rating_{rating}'] = Count('id', filter=scope & Q(rating_avg__gte=rating))
+    for c in nav_categories():
+        aggregates[f'category_{c.pk}'] = Count('id', filter=Q(category_id=c.pk))
+
+    counts = base.order_by().aggregate(**aggregates)
+    cache.set(key, counts, settings.PAGE_CACHE_TIMEOUT)
+    return counts
+
+
+def _url(params, **changes):
+    query = params.copy()
+    for name in ('page', 'cursor'):
+        query.pop(name, None)
+    for name, value in changes.items():
+        if value is None:
+            query.pop(name, None)
+        else:
+            query[name] = value
+    encoded = query.urlencode()
+    return f'?{encoded}' if encoded else '?'
+
+
+def build_facets(params, counts, selected):
+    """Дані для шаблону: значення фасетів із кількістю, станом і посиланням."""
+    return {
+        'price': [
+            {
+                'label': label,
+                'count': counts[f'price_{index}'],
+                'selected': selected.get('price') == key,
+                'url': _url(params, price=None if selected.get('price') == key else key),
+            }
+            for index, (key, label, _) in enumerate(PRICE_RANGES)
+        ],
+        'on_sale': {
+            'count': counts['on_sale'],
+            'selected': 'on_sale' in selected,
+            'url': _url(params, on_sale=None if 'on_sale' in selected else '1'),
+        },
+        'rating': [
+            {
+                'value': rating,
+                'count': counts[f'rating_{rating}'],
+                'selected': selected.get('min_rating') == rating,
+                'url': _url(params, min_rating=None if selected.get('min_rating') == rating else str(rating)),
+            }
+            for rating in MIN_RATINGS
+        ],
+        'categories': [
+            {
+                'category': c,
+                'count': counts.get(f'category_{c.pk}', 0),
+                'url': c.get_absolute_url() + _url(params).rstrip('?'),
+            }
+            for c in nav_categories()
+        ],
+        'total': counts['total'],
+    }
+
+
+def facet_query(params):
+    """Рядок з активними фасетами й пошуком для посилань пагінації/сортування."""
+    query = params.copy()
+    for name in list(query.keys()):
+        if name not in FACET_PARAMS:
+            query.pop(name)
+    return query.urlencode()
@@ -0,0 +1,316 @@
+"""
+sitemap.xml та фіди товарів для маркетплейсів (XML у форматі Google Merchant і CSV).
+
+Товари читаються з БД через values().iterator(), а відповідь формується
+потоково (StreamingHttpResponse), тож весь каталог не тримається в пам'яті.
+Sitemap товарів ділиться на секції по SITEMAP_MAX_URLS адрес; межі секцій
+шукаються keyset-ом по id. Кожна секція та фід кешуються на диску
+(FEED_CACHE_DIR) під підписом (див. signature). Після зміни товарів
+перегенеровуються лише ті файли, чий підпис змінився. Суфікс .gz означає
+gzip-стиснення.
+"""
+import csv
+import hashlib
+import os
+import tempfile
+import zlib
+from pathlib import Path
+from urllib.parse import urljoin
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db.models import Count, Max, Sum
+from django.http import Http404, StreamingHttpResponse
+from django.urls import reverse
+from django.views.decorators.http import require_GET
+
+from .models import Category, Product
+
+SITEMAP_MAX_URLS = 50000
+FEED_CHUNK_SIZE = 2000
+# Розмір шматка, яким відповідь віддається клієнту та пишеться на диск
+STREAM_BUFFER_SIZE = 64 * 1024
+CURRENCY = 'UAH'
+
+FEED_PRODUCT_FIELDS = (
+    'id', 'slug', 'name', 'description', 'price', 'effective_price', 'image', 'updated_at', 'stock',
+)
+
+SITEMAP_NS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+
+
+def feed_products():
+    return Product.objects.filter(is_available=True)
+
+
+def section_bounds(limit=None):
+    """
+    Межі перших limit (або всіх) секцій sitemap:
+    [(перший id, перший id наступної секції або None)]. Кожна межа шукається
+    від попередньої (id >= start), а не OFFSET від початку каталогу.
+    """
+    ids = feed_products().order_by('id').values_list('id', flat=True)
+    start = ids.first()
+    bounds = []
+    while start is not None and (limit is None or len(bounds) < limit):
+        end = ids.filter(id__gte=start)[SITEMAP_MAX_URLS:SITEMAP_MAX_URLS + 1].first()
+        bounds.append((start, end))
+        start = end
+    return bounds
+
+
+def _section_queryset(number, bounds=None):
+    """Товари секції sitemap з номером number (від 1) або None, якщо такої немає."""
+    if number < 1:
+        return None
+    bounds = section_bounds(number) if bounds is None else bounds
+    if number > len(bounds):
+        return None
+    start, end = bounds[number - 1]
+    qs = feed_products().filter(id__gte=start)
+    return qs.filter(id__lt=end) if end is not None else qs
+
+
+def signature(queryset):
+    """
+    Підпис вмісту: змінюється при додаванні, видаленні, редагуванні чи зміні ціни товару,
+    а також коли товар розпродано чи поповнено (stock змінюється без updated_at) —
+    для цього хешується сам набір id розпроданих товарів, а не їх кількість.
+    """
+    result = queryset.aggregate(
+        count=Count('id'), updated=Max('updated_at'), prices=Sum('effective_price'),
+        last_id=Max('id'),
+    )
+    sold_out = hashlib.md5()
+    ids = queryset.filter(stock=0).order_by('id').values_list('id', flat=True)
+    for pk in ids.iterator(chunk_size=FEED_CHUNK_SIZE):
+        sold_out.update(b'%d,' % pk)
+    result['sold_out'] = sold_out.hexdigest()
+    return result
+
+
+def _signature_key(*parts):
+    return hashlib.md5('|'.join(str(p) for p in parts).encode()).hexdigest()[:16]
+
+
+# --- генерація вмісту ---
+
+def _rows(queryset):
+    return queryset.order_by('id').values(*FEED_PRODUCT_FIELDS).iterator(chunk_size=FEED_CHUNK_SIZE)
+
+
+def _product_url(base_url, row):
+    return base_url + reverse('main:product_detail', args=[row['id'], row['slug']])
+
+
+def _image_url(base_url, row):
+    return urljoin(base_url, default_storage.url(row['image'])) if row['image'] else ''
+
+
+def product_sitemap(queryset, base_url):
+    yield f'<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="{SITEMAP_NS}">\n'
+    for row in _rows(queryset):
+        yield (
+            f'<url><loc>{escape(_product_url(base_url, row))}</loc>'
+            f'<lastmod>{row["updated_at"].date().isoformat()}</lastmod></url>\n'
+        )
+    yield '</urlset>\n'
+
+
+def category_sitemap(base_url):
+    yield f'<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="{SITEMAP_NS}">\n'
+    yield f'<url><loc>{escape(base_url + reverse("main:product_list"))}</loc></url>\n'
+    for category in Category.objects.filter(is_active=True).order_by('id').iterator():
+        yield f'<url><loc>{escape(base_url + category.get_absolute_url())}</loc></url>\n'
+    yield '</urlset>\n'
+
+
+def sitemap_index(base_url):
+    yield f'<?xml version="1.0" encoding="UTF-8"?>\n<sitemapindex xmlns="{SITEMAP_NS}">\n'
+    yield f'<sitemap><loc>{escape(base_url + reverse("main:sitemap_categories"))}</loc></sitemap>\n'
+    bounds = section_bounds()
+    for number in range(1, max(1, len(bounds)) + 1):
+        url = base_url + reverse('main:sitemap_products', args=[number])
+        section = _section_queryset(number, bounds)
+        updated = signature(section)['updated'] if section is not None else None
+        lastmod = f'<lastmod>{updated.date().isoformat()}</lastmod>' if updated else ''
+        yield f'<sitemap><loc>{escape(url)}</loc>{lastmod}</sitemap>\n'
+    yield '</sitemapindex>\n'
+
+
+def _price(value):
+    return f'{value} {CURRENCY}'
+
+
+def _availability(row):
+    # stock = NULL — залишки не обліковуються
+    return 'out of stock' if row['stock'] == 0 else 'in stock'
+
+
+def merchant_xml(queryset, base_url):
+    yield (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<rss version="2.0" xmlns:g="http://base.google.com/ns/1.0"><channel>\n'
+        f'<title>Каталог</title><link>{escape(base_url)}/</link>\n'
+    )
+    for row in _rows(queryset):
+        sale = ''
+        if row['effective_price'] < row['price']:
+            sale = f'<g:sale_price>{_price(row["effective_price"])}</g:sale_price>'
+        yield (
+            f'<item><g:id>{row["id"]}</g:id><title>{escape(row["name"])}</title>'
+            f'<description>{escape(row["description"])}</description>'
+            f'<link>{escape(_product_url(base_url, row))}</link>'
+            f'<g:image_link>{escape(_image_url(base_url, row))}</g:image_link>'
+            f'<g:availability>{_availability(row)}</g:availability>'
+            f'<g:price>{_price(row["price"])}</g:price>{sale}</item>\n'
+        )
+    yield '</channel></rss>\n'
+
+
+class _Echo:
+    """Псевдофайл для csv.writer: write() повертає рядок замість запису."""
+
+    def write(self, value):
+        return value
+
+
+MERCHANT_CSV_HEADER = (
+    'id', 'title', 'description', 'link', 'image_link', 'availability', 'price', 'sale_price',
+)
+
+
+def merchant_csv(queryset, base_url):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(MERCHANT_CSV_HEADER)
+    for row in _rows(queryset):
+        sale = _price(row['effective_price']) if row['effective_price'] < row['price'] else ''
+        yield writer.writerow((
+            row['id'], row['name'], row['description'], _product_url(base_url, row),
+            _image_url(base_url, row), _availability(row), _price(row['price']), sale,
+        ))
+
+
+# --- потокова відповідь, стиснення та дисковий кеш ---
+
+def _buffered(chunks):
+    """Склеює дрібні рядки в шматки по STREAM_BUFFER_SIZE байт."""
+    buffer, size = [], 0
+    for chunk in chunks:
+        data = chunk.encode()
+        buffer.append(data)
+        size += len(data)
+        if size >= STREAM_BUFFER_SIZE:
+            yield b''.join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield b''.join(buffer)
+
+
+def _gzip(chunks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def _read_file(path):
+    with open(path, 'rb') as f:
+        while chunk := f.read(STREAM_BUFFER_SIZE):
+            yield chunk
+
+
+def _write_through(chunks, path):
+    """
+    Віддає шматки далі й паралельно пише їх у файл;
+    файл з'являється лише після успішного завершення.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            for chunk in chunks:
+                f.write(chunk)
+                yield chunk
+        prefix = path.name.rsplit('.', 1)[0]
+        for stale in path.parent.glob(prefix + '.*'):
+            if stale.name.rsplit('.', 1)[0] == prefix:
+                stale.unlink(missing_ok=True)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+
+
+def cached_stream(name, key, generate, compress=False):
+    """
+    Байтові шматки файлу name: з дискового кешу, якщо його підпис key актуальний,
+    інакше генерує вміст через generate() і зберігає.
+    """
+    chunks = _buffered(generate())
+    if compress:
+        chunks = _gzip(chunks)
+    cache_dir = getattr(settings, 'FEED_CACHE_DIR', None)
+    if not cache_dir:
+        return chunks
+    path = Path(cache_dir) / f'{name}{".gz" if compress else ""}.{key}'
+    if path.exists():
+        return _read_file(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return _write_through(chunks, path)
+
+
+def _response(chunks, content_type, compress):
+    if compress:
+        content_type = 'application/gzip'
+    return StreamingHttpResponse(chunks, content_type=content_type)
+
+
+def _base_url(request):
+    return request.build_absolute_uri('/').rstrip('/')
+
+
+# --- views ---
+
+@require_GET
+def sitemap_index_view(request):
+    chunks = _buffered(sitemap_index(_base_url(request)))
+    return StreamingHttpResponse(chunks, content_type='application/xml; charset=utf-8')
+
+
+@require_GET
+def sitemap_categories_view(request, compress=False):
+    chunks = _buffered(category_sitemap(_base_url(request)))
+    chunks = _gzip(chunks) if compress else chunks
+    return _response(chunks, 'application/xml; charset=utf-8', compress)
+
+
+@require_GET
+def sitemap_products_view(request, number, compress=False):
+    section = _section_queryset(number)
+    if section is None:
+        raise Http404
+    base_url = _base_url(request)
+    key = _signature_key(base_url, *signature(section).values())
+    chunks = cached_stream(
+        f'sitemap-products-{number}.xml', key, lambda: product_sitemap(section, base_url), compress,
+    )
+    return _response(chunks, 'application/xml; charset=utf-8', compress)
+
+
+MERCHANT_FORMATS = {
+    'xml': (merchant_xml, 'application/xml; charset=utf-8'),
+    'csv': (merchant_csv, 'text/csv; charset=utf-8'),
+}
+
+
+@require_GET
+def merchant_feed_view(request, fmt, compress=False):
+    generate, content_type = MERCHANT_FORMATS[fmt]
+    base_url = _base_url(request)
+    products = feed_products()
+    key = _signature_key(base_url, *signature(products).values())
+    chunks = cached_stream(f'merchant.{fmt}', key, lambda: generate(products, base_url), compress)
+    return _response(chunks, content_type, compress)
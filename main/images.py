@@ -0,0 +1,124 @@
+"""
+Зменшені варіанти зображень товарів і категорій (WebP).
+
+Для оригіналу products/2025/10/22/photo.jpg поруч зберігаються
+photo.320w.webp, photo.640w.webp, photo.1024w.webp (у назві — цільова
+ширина, фактична буває меншою для вузьких оригіналів). Варіанти створюються
+при збереженні (сигнали main/signals.py) або командою generate_image_variants
+для старих файлів — рендер їх не створює, а лише читає список з кешу.
+Оригінал, який не вдалося декодувати, запам'ятовується й не декодується знову.
+"""
+import hashlib
+import io
+import logging
+import os
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+VARIANT_WIDTHS = (320, 640, 1024)
+VARIANT_QUALITY = 80
+VARIANTS_CACHE_TIMEOUT = 24 * 60 * 60
+
+logger = logging.getLogger(__name__)
+
+
+def variant_name(name, width):
+    root, _ = os.path.splitext(name)
+    return f'{root}.{width}w.webp'
+
+
+def _cache_key(kind, *parts):
+    digest = hashlib.md5('|'.join(str(p) for p in parts).encode()).hexdigest()
+    return f'imgvariants:{kind}:{digest}'
+
+
+def generate_variants(name, storage=default_storage, overwrite=False):
+    """
+    Створює WebP-варіанти для файлу name. Ширші за оригінал не створюються
+    (крім найменшого, щоб завжди був хоча б один). Повертає {цільова ширина: ім'я}.
+    Невдале декодування запам'ятовується: повторно (крім overwrite) не пробуємо.
+    """
+    failed_key = _cache_key('failed', name)
+    if not overwrite and cache.get(failed_key):
+        return {}
+    result = {}
+    missing = [
+        w for w in VARIANT_WIDTHS
+        if overwrite or not storage.exists(variant_name(name, w))
+    ]
+    existing = [w for w in VARIANT_WIDTHS if w not in missing]
+    result.update({w: variant_name(name, w) for w in existing})
+    if not missing:
+        return result
+
+    try:
+        with storage.open(name, 'rb') as fh:
+            image = Image.open(fh)
+            image.load()
+    except (OSError, UnidentifiedImageError):
+        logger.warning('Не вдалося відкрити зображення %s', name)
+        cache.set(failed_key, True, None)
+        return result
+    cache.delete(failed_key)
+
+    image = ImageOps.exif_transpose(image)
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+
+    for width in missing:
+        if width > image.width and width != VARIANT_WIDTHS[0]:
+            continue
+        target = image.copy()
+        target.thumbnail((width, width * 10), Image.Resampling.LANCZOS)
+        buffer = io.BytesIO()
+        target.save(buffer, 'WEBP', quality=VARIANT_QUALITY, method=4)
+        out_name = variant_name(name, width)
+        if overwrite and storage.exists(out_name):
+            storage.delete(out_name)
+        saved = storage.save(out_name, ContentFile(buffer.getvalue()))
+        if saved != out_name:
+            # паралельний запит уже створив цей варіант — копія не потрібна
+            storage.delete(saved)
+        result[width] = out_name
+    return dict(sorted(result.items()))
+
+
+def _width(storage, name):
+    """Фактична ширина збереженого варіанта (PIL читає лише заголовок файлу)."""
+    try:
+        with storage.open(name, 'rb') as fh:
+            return Image.open(fh).width
+    except (OSError, UnidentifiedImageError):
+        return None
+
+
+def _existing_variants(name, storage):
+    """[(фактична ширина, ім'я)] наявних варіантів, за зростанням ширини."""
+    found = {}
+    for target in VARIANT_WIDTHS:
+        variant = variant_name(name, target)
+        if storage.exists(variant):
+            width = _width(storage, variant)
+            if width:
+                found.setdefault(width, variant)
+    return sorted(found.items())
+
+
+def image_variants(field_file):
+    """
+    {фактична ширина: url} наявних варіантів для ImageField. Список кешується
+    за ім'ям файлу та updated_at власника; варіанти тут не створюються.
+    """
+    if not field_file:
+        return {}
+    storage = field_file.storage
+    updated_at = getattr(field_file.instance, 'updated_at', None)
+    key = _cache_key('list', field_file.name, updated_at.isoformat() if updated_at else '')
+    variants = cache.get(key)
+    if variants is None:
+        variants = _existing_variants(field_file.name, storage)
+        cache.set(key, variants, VARIANTS_CACHE_TIMEOUT)
+    return {width: storage.url(name) for width, name in variants}
@@ -0,0 +1,355 @@
+"""
+Масовий імпорт каталогу з фідів постачальників (CSV або JSONL).
+
+Фід читається потоково й обробляється пакетами, кожен пакет — в окремій
+транзакції. Категорії та товари upsert-яться за slug через
+bulk_create(update_conflicts=True); знижки природного ключа не мають, тому
+зіставляються за (товар, тип, початок дії) і пишуться bulk_update/bulk_create.
+Оновлюються лише колонки, присутні у фіді, а рядки, хеш яких збігається
+з хешем поточних значень у БД, пропускаються.
+"""
+import csv
+import hashlib
+import json
+from collections import Counter
+from datetime import datetime, time, timezone as dt_timezone
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from discounts.models import Discount
+from discounts.pricing import refresh_products_by_id
+from .caching import CATALOG_GENERATION, NAV_GENERATION, bump_generation
+from .models import PRICING_FIELDS, Category, Product
+from .search import index_queryset
+
+KINDS = ('categories', 'products', 'discounts')
+
+# Колонки фіду для кожного типу; перші — обов'язкові
+FEED_FIELDS = {
+    'categories': ('slug', 'name', 'description', 'is_active'),
+    'products': (
+        'slug', 'name', 'price', 'description', 'detailed_description',
+        'category', 'is_available', 'featured',
+    ),
+    'discounts': (
+        'product', 'discount_type', 'value', 'start_date', 'end_date',
+        'is_active', 'min_quantity', 'description',
+    ),
+}
+REQUIRED_FIELDS = {
+    'categories': ('slug', 'name'),
+    'products': ('slug', 'name', 'price'),
+    'discounts': ('product', 'discount_type', 'value', 'start_date', 'end_date'),
+}
+# Колонка фіду -> поле моделі
+DB_FIELDS = {'category': 'category_id', 'product': 'product_id'}
+
+# Скільки помилок зберігати для звіту
+MAX_REPORTED_ERRORS = 20
+
+TRUE_VALUES = {'1', 'true', 'yes', 'y', 't', 'так'}
+
+
+class FeedError(ValueError):
+    pass
+
+
+def _bool(value):
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in TRUE_VALUES
+
+
+def _decimal(value):
+    try:
+        return Decimal(str(value).strip()).quantize(Decimal('0.01'))
+    except InvalidOperation:
+        raise FeedError(f'некоректне число: {value!r}')
+
+
+def _datetime(value):
+    value = str(value).strip()
+    parsed = parse_datetime(value)
+    if parsed is None:
+        day = parse_date(value)
+        if day is None:
+            raise FeedError(f'некоректна дата: {value!r}')
+        parsed = datetime.combine(day, time.min)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def _int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise FeedError(f'некоректне ціле число: {value!r}')
+
+
+CONVERTERS = {
+    'price': _decimal,
+    'value': _decimal,
+    'start_date': _datetime,
+    'end_date': _datetime,
+    'min_quantity': _int,
+    'is_active': _bool,
+    'is_available': _bool,
+    'featured': _bool,
+}
+
+
+def _canonical(value):
+    if isinstance(value, datetime):
+        return value.astimezone(dt_timezone.utc).isoformat()
+    if isinstance(value, Decimal):
+        return str(value.quantize(Decimal('0.01')))
+    return repr(value)
+
+
+def content_hash(values, fields):
+    """Хеш значень полів — однаковий для рядка фіду та рядка з БД."""
+    raw = '\x1f'.join(_canonical(values[f]) for f in fields)
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+def _decoded_lines(f, start=1):
+    for line, raw in enumerate(f, start):
+        try:
+            yield line, raw.decode('utf-8')
+        except UnicodeDecodeError:
+            raise FeedError(f'рядок {line}: некоректне кодування (очікується UTF-8)')
+
+
+def read_feed(path, fmt=None):
+    """
+    Потоково читає фід як пари (номер рядка у файлі, словник).
+    Зіпсований файл (кодування, JSON, не-об'єкт у JSONL) — FeedError з номером рядка.
+    """
+    fmt = fmt or ('jsonl' if path.endswith(('.jsonl', '.ndjson')) else 'csv')
+    with open(path, 'rb') as f:
+        lines = _decoded_lines(f)
+        if fmt == 'csv':
+            reader = csv.DictReader(text for _, text in lines)
+            try:
+                reader.fieldnames  # читає заголовок
+                line = reader.line_num
+                for row in reader:
+                    yield line + 1, row
+                    line = reader.line_num
+            except csv.Error as e:
+                raise FeedError(f'рядок {reader.line_num}: {e}')
+        else:
+            for line, text in lines:
+                if not text.strip():
+                    continue
+                try:
+                    row = json.loads(text)
+                except json.JSONDecodeError as e:
+                    raise FeedError(f'рядок {line}: некоректний JSON ({e.msg})')
+                if not isinstance(row, dict):
+                    raise FeedError(f'рядок {line}: очікується JSON-об\'єкт')
+                yield line, row
+
+
+def _batches(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+class CatalogImporter:
+    """
+    Імпорт одного фіду з пар (номер рядка, словник), як їх віддає read_feed.
+    stats — лічильники rows/created/updated/unchanged/errors,
+    errors — перші MAX_REPORTED_ERRORS помилок як (номер рядка, повідомлення).
+    """
+
+    def __init__(self, kind, batch_size=1000):
+        if kind not in KINDS:
+            raise FeedError(f'невідомий тип фіду: {kind}')
+        self.kind = kind
+        self.batch_size = batch_size
+        self.stats = Counter()
+        self.errors = []
+        self.fields = None
+        self._category_ids = None
+        self._product_ids = None
+        self._renamed_categories = set()
+
+    @property
+    def category_ids(self):
+        if self._category_ids is None:
+            self._category_ids = dict(Category.objects.values_list('slug', 'id'))
+        return self._category_ids
+
+    @property
+    def product_ids(self):
+        if self._product_ids is None:
+            self._product_ids = dict(Product.objects.values_list('slug', 'id'))
+        return self._product_ids
+
+    def run(self, rows, progress=None):
+        for batch in _batches(rows, self.batch_size):
+            if self.fields is None:
+                self.fields = self._feed_fields(batch[0][1])
+            records = []
+            for line, row in batch:
+                try:
+                    records.append((line, self._parse(row)))
+                except FeedError as e:
+                    self._error(line, e)
+            with transaction.atomic():
+                getattr(self, f'_import_{self.kind}')(records)
+            self.stats['rows'] += len(batch)
+            if progress:
+                progress(self.stats)
+        self._finish()
+        return self.stats
+
+    def _feed_fields(self, row):
+        fields = [f for f in FEED_FIELDS[self.kind] if f in row]
+        missing = [f for f in REQUIRED_FIELDS[self.kind] if f not in fields]
+        if missing:
+            raise FeedError(f'у фіді бракує колонок: {", ".join(missing)}')
+        return fields
+
+    def _error(self, line, error):
+        self.stats['errors'] += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((line, str(error)))
+
+    def _parse(self, row):
+        """Рядок фіду -> словник значень полів моделі."""
+        model = {'categories': Category, 'products': Product, 'discounts': Discount}[self.kind]
+        values = {}
+        for field in self.fields:
+            raw = row.get(field)
+            if isinstance(raw, str):
+                raw = raw.strip()
+            if raw in (None, ''):
+                if field in REQUIRED_FIELDS[self.kind]:
+                    raise FeedError(f'порожнє поле {field}')
+                value = None if field in DB_FIELDS else model._meta.get_field(field).get_default()
+            elif field == 'category':
+                value = self.category_ids.get(raw)
+                if value is None:
+                    raise FeedError(f'невідома категорія: {raw}')
+            elif field == 'product':
+                value = self.product_ids.get(raw)
+                if value is None:
+                    raise FeedError(f'невідомий товар: {raw}')
+            else:
+                value = CONVERTERS.get(field, str)(raw)
+            values[DB_FIELDS.get(field, field)] = value
+        return values
+
+    @property
+    def db_fields(self):
+        return [DB_FIELDS.get(f, f) for f in self.fields]
+
+    def _changed(self, model, key, records):
+        """Відкидає рядки без змін; повертає {ключ: значення} для запису і set наявних ключів."""
+        fields = self.db_fields
+        by_key = {values[key]: values for _, values in records}
+        existing = {
+            row[key]: content_hash(row, fields)
+            for row in model.objects.filter(**{f'{key}__in': list(by_key)}).values(*fields)
+        }
+        changed = {}
+        for k, values in by_key.items():
+            if existing.get(k) == content_hash(values, fields):
+                self.stats['unchanged'] += 1
+            else:
+                self.stats['updated' if k in existing else 'created'] += 1
+                changed[k] = values
+        return changed, existing.keys()
+
+    def _import_categories(self, records):
+        changed, existing = self._changed(Category, 'slug', records)
+        if not changed:
+            return
+        Category.objects.bulk_create(
+            [Category(**values) for values in changed.values()],
+            update_conflicts=True, unique_fields=['slug'],
+            update_fields=[f for f in self.db_fields if f != 'slug'],
+        )
+        ids = dict(Category.objects.filter(slug__in=list(changed)).values_list('slug', 'id'))
+        self.category_ids.update(ids)
+        if 'name' in self.fields:
+            self._renamed_categories.update(ids[slug] for slug in changed if slug in existing)
+
+    def _import_products(self, records):
+        changed, _ = self._changed(Product, 'slug', records)
+        if not changed:
+            return
+        products = []
+        for values in changed.values():
+            # знімок ціни без знижок; товари зі знижками перераховуються нижче
+            products.append(Product(**values, effective_price=values['price']))
+        Product.objects.bulk_create(
+            products, update_conflicts=True, unique_fields=['slug'],
+            update_fields=[f for f in self.db_fields if f != 'slug'] + list(PRICING_FIELDS) + ['updated_at'],
+        )
+        ids = dict(Product.objects.filter(slug__in=list(changed)).values_list('slug', 'id'))
+        if self._product_ids is not None:
+            self._product_ids.update(ids)
+
+        discounted = (
+            Discount.objects.filter(product_id__in=ids.values(), is_active=True, end_date__gte=timezone.now())
+            .values_list('product_id', flat=True).distinct()
+        )
+        refresh_products_by_id(list(discounted))
+        index_queryset(Product.objects.filter(id__in=ids.values()), self.batch_size)
+
+    def _import_discounts(self, records):
+        fields = self.db_fields
+        key_fields = ('product_id', 'discount_type', 'start_date')
+        by_key = {tuple(values[f] for f in key_fields): (line, values) for line, values in records}
+
+        existing = {}
+        product_ids = {values['product_id'] for _, values in by_key.values()}
+        for row in Discount.objects.filter(product_id__in=product_ids).values('id', *fields):
+            existing[tuple(row[f] for f in key_fields)] = (row['id'], content_hash(row, fields))
+
+        to_create, to_update = [], []
+        for k, (line, values) in by_key.items():
+            pk, old_hash = existing.get(k, (None, None))
+            if old_hash == content_hash(values, fields):
+                self.stats['unchanged'] += 1
+                continue
+            discount = Discount(id=pk, **values)
+            try:
+                if discount.discount_type not in dict(Discount.DISCOUNT_TYPE_CHOICES):
+                    raise ValidationError(f'невідомий тип знижки: {discount.discount_type}')
+                discount.clean()
+            except ValidationError as e:
+                self._error(line, f'{values["product_id"]}: {"; ".join(e.messages)}')
+                continue
+            (to_update if pk else to_create).append(discount)
+
+        Discount.objects.bulk_create(to_create)
+        Discount.objects.bulk_update(to_update, [f for f in fields if f not in key_fields])
+        self.stats['created'] += len(to_create)
+        self.stats['updated'] += len(to_update)
+        refresh_products_by_id({d.product_id for d in to_create + to_update})
+
+    def _finish(self):
+        if self._renamed_categories:
+            # назва категорії входить до пошукового індексу
+            index_queryset(Product.objects.filter(category_id__in=self._renamed_categories), self.batch_size)
+        if self.kind == 'categories':
+            bump_generation(NAV_GENERATION, CATALOG_GENERATION)
+        else:
+            bump_generation(CATALOG_GENERATION)
+
+
+def import_feed(path, kind, batch_size=1000, fmt=None, progress=None):
+    importer = CatalogImporter(kind, batch_size)
+    importer.run(read_feed(path, fmt), progress)
+    return importer
@@ -0,0 +1,111 @@
+"""
+Режим великих таблиць для ModelAdmin.
+
+LargeTableAdminMixin прибирає з changelist точні COUNT(*): кількість
+оцінюється (статистика PostgreSQL або COUNT, обмежений ESTIMATE_LIMIT рядками),
+а сторінки перемикаються keyset-курсором (?cursor=) замість OFFSET.
+Курсор працює за першим полем сортування changelist, якщо це звичайне поле
+моделі; інакше — за id. Тому в sortable_by варто лишати індексовані колонки.
+"""
+from django.contrib.admin import ShowFacets
+from django.contrib.admin.views.main import ChangeList
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+from .pagination import paginate_by_cursor
+
+# Після скількох рядків COUNT зупиняється, і кількість показується як "N+"
+ESTIMATE_LIMIT = 10000
+CURSOR_VAR = 'cursor'
+
+
+def estimate_count(queryset, limit=ESTIMATE_LIMIT):
+    """
+    Оцінка кількості рядків. Для нефільтрованої таблиці на PostgreSQL — зі
+    статистики планувальника, інакше COUNT по підзапиту з LIMIT.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor == 'postgresql' and not queryset.query.where:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        if row and row[0] > 0:
+            return row[0]
+    return queryset.order_by()[:limit].count()
+
+
+class EstimatedCountPaginator(Paginator):
+    @cached_property
+    def count(self):
+        return estimate_count(self.object_list)
+
+
+class LargeTableChangeList(ChangeList):
+    def get_filters_params(self, params=None):
+        lookup_params = super().get_filters_params(params)
+        lookup_params.pop(CURSOR_VAR, None)
+        return lookup_params
+
+    def get_query_string(self, new_params=None, remove=None):
+        # курсор дійсний лише для поточних фільтрів і сортування
+        if CURSOR_VAR not in (new_params or {}):
+            remove = [*(remove or []), CURSOR_VAR]
+        return super().get_query_string(new_params, remove)
+
+    def cursor_ordering(self, request):
+        field_name = next(iter(self.get_ordering(request, self.queryset)), '-id')
+        if not isinstance(field_name, str):
+            return '-id'
+        descending = field_name.startswith('-')
+        name = field_name.lstrip('-')
+        name = 'id' if name == 'pk' else name
+        fields = {f.name for f in self.model._meta.concrete_fields if not f.is_relation}
+        if name not in fields:
+            return '-id'
+        return ('-' if descending else '') + name
+
+    def get_results(self, request):
+        ordering = self.cursor_ordering(request)
+        field_name = ordering.lstrip('-')
+        keys = self.queryset.values('id', field_name)
+        page = paginate_by_cursor(keys, ordering, request.GET.get(CURSOR_VAR), self.list_per_page)
+
+        prefix = '-' if ordering.startswith('-') else ''
+        # queryset, а не список: на ньому будується formset для list_editable
+        self.result_list = self.queryset.filter(id__in=[row['id'] for row in page]).order_by(
+            ordering, f'{prefix}id',
+        )
+        self.paginator = self.model_admin.get_paginator(request, self.queryset, self.list_per_page)
+        self.result_count = self.paginator.count
+        self.result_count_is_estimate = self.result_count >= ESTIMATE_LIMIT
+        self.full_result_count = None
+        self.show_full_result_count = False
+        self.show_admin_actions = True
+        self.can_show_all = False
+        self.multi_page = page.has_next() or page.has_previous()
+        self.cursor_page = page
+
+    @property
+    def next_page_url(self):
+        return self.get_query_string({CURSOR_VAR: self.cursor_page.next_cursor})
+
+    @property
+    def previous_page_url(self):
+        return self.get_query_string({CURSOR_VAR: self.cursor_page.previous_cursor})
+
+
+class LargeTableAdminMixin:
+    """Оцінена кількість + keyset-пагінація changelist для великих таблиць."""
+
+    change_list_template = 'admin/large_table_change_list.html'
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    # лічильники фасетів у фільтрах — це ще по COUNT на кожен варіант
+    show_facets = ShowFacets.NEVER
+
+    def get_changelist(self, request, **kwargs):
+        return LargeTableChangeList
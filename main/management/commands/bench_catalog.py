@@ -0,0 +1,162 @@
+import asyncio
+import importlib
+import statistics
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import AsyncClient, Client
+from django.test.utils import override_settings
+from django.urls import clear_url_caches
+
+from main.models import Product
+
+
+def _percentile(values, percent):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(percent / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+@contextmanager
+def _catalog_views(use_async):
+    """Перемикає main.urls між sync та async в'юхами каталогу."""
+    def reload_urls():
+        importlib.reload(importlib.import_module('main.urls'))
+        importlib.reload(importlib.import_module(settings.ROOT_URLCONF))
+        clear_url_caches()
+
+    try:
+        with override_settings(CATALOG_ASYNC_VIEWS=use_async):
+            reload_urls()
+            yield
+    finally:
+        reload_urls()
+
+
+def _run_threads(make_get, paths, total, concurrency):
+    """Розподіляє total запитів між concurrency потоками; make_get() дає потоку get(path) -> status."""
+    def worker(count):
+        get = make_get()
+        latencies = []
+        for i in range(count):
+            started = time.perf_counter()
+            status = get(paths[i % len(paths)])
+            latencies.append(time.perf_counter() - started)
+            if status != 200:
+                raise CommandError(f'{paths[i % len(paths)]}: HTTP {status}')
+        return latencies
+
+    shares = [total // concurrency + (1 if i < total % concurrency else 0) for i in range(concurrency)]
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return [t for latencies in pool.map(worker, shares) for t in latencies]
+
+
+def _run_wsgi(paths, total, concurrency):
+    """Запити через WSGI-обробник (django.test.Client) у concurrency потоках."""
+    def make_get():
+        client = Client()
+        return lambda path: client.get(path).status_code
+
+    return _run_threads(make_get, paths, total, concurrency)
+
+
+def _run_http(base_url, paths, total, concurrency):
+    """Справжні HTTP-запити до запущеного сервера (gunicorn, uvicorn тощо)."""
+    def get(path):
+        try:
+            with urllib.request.urlopen(base_url.rstrip('/') + path) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as exc:
+            return exc.code
+
+    return _run_threads(lambda: get, paths, total, concurrency)
+
+
+async def _run_asgi(paths, total, concurrency):
+    """Запити через ASGI-обробник (django.test.AsyncClient), не більше concurrency одночасно."""
+    client = AsyncClient()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i):
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.get(paths[i % len(paths)])
+            elapsed = time.perf_counter() - started
+        if response.status_code != 200:
+            raise CommandError(f'{paths[i % len(paths)]}: HTTP {response.status_code}')
+        return elapsed
+
+    return await asyncio.gather(*(one(i) for i in range(total)))
+
+
+class Command(BaseCommand):
+    help = (
+        "Міряє латентність (p50/p99) сторінок каталогу під конкурентним навантаженням. "
+        "Без --url порівнює в одному процесі sync-в'юхи через WSGI-обробник з async-в'юхами "
+        "через ASGI-обробник: це порівняння коду в'юх, а не серверів. Для висновків про "
+        "розгортання запустіть gunicorn і uvicorn (з CATALOG_ASYNC_VIEWS) і виміряйте "
+        "кожен через --url."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Запитів на кожен режим.')
+        parser.add_argument('--concurrency', type=int, default=20)
+        parser.add_argument('--mode', choices=('wsgi', 'asgi', 'both'), default='both')
+        parser.add_argument('--path', action='append', dest='paths',
+                            help='Адреса для навантаження (можна кілька); типово — каталог і товар.')
+        parser.add_argument('--page-cache', action='store_true',
+                            help='Не вимикати кеш сторінок для анонімів (інакше міряється саме рендер).')
+        parser.add_argument('--url',
+                            help='Адреса запущеного сервера, напр. http://127.0.0.1:8000; '
+                                 'тоді --mode і --page-cache не діють.')
+
+    def handle(self, *args, **options):
+        paths = options['paths'] or self._default_paths()
+        total, concurrency = options['requests'], options['concurrency']
+        if options['url']:
+            # налаштування визначає сам сервер; прогрів — як і в режимах нижче
+            _run_http(options['url'], paths, len(paths), 1)
+            started = time.perf_counter()
+            latencies = _run_http(options['url'], paths, total, concurrency)
+            self._report(options['url'], latencies, time.perf_counter() - started)
+            return
+
+        overrides = {'ALLOWED_HOSTS': [*settings.ALLOWED_HOSTS, 'testserver']}
+        if not options['page_cache']:
+            overrides['PAGE_CACHE_TIMEOUT'] = 0
+
+        modes = ('wsgi', 'asgi') if options['mode'] == 'both' else (options['mode'],)
+        with override_settings(**overrides):
+            for mode in modes:
+                with _catalog_views(use_async=mode == 'asgi'):
+                    # прогрів: ліниві WebP-варіанти, кеш навігації та фрагментів
+                    self._run(mode, paths, len(paths), 1)
+                    started = time.perf_counter()
+                    latencies = self._run(mode, paths, total, concurrency)
+                    elapsed = time.perf_counter() - started
+                self._report(mode.upper(), latencies, elapsed)
+
+    def _run(self, mode, paths, total, concurrency):
+        if mode == 'wsgi':
+            return _run_wsgi(paths, total, concurrency)
+        return asyncio.run(_run_asgi(paths, total, concurrency))
+
+    def _default_paths(self):
+        product = Product.objects.filter(is_available=True).order_by('-views').first()
+        if product is None:
+            raise CommandError('У каталозі немає доступних товарів.')
+        return ['/', product.get_absolute_url()]
+
+    def _report(self, label, latencies, elapsed):
+        ms = [t * 1000 for t in latencies]
+        self.stdout.write(
+            f'{label}: {len(ms)} запитів за {elapsed:.2f} с ({len(ms) / elapsed:.0f} запитів/с), '
+            f'p50 {statistics.median(ms):.1f} мс, p99 {_percentile(ms, 99):.1f} мс, '
+            f'макс {max(ms):.1f} мс'
+        )
@@ -0,0 +1,41 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from main.images import generate_variants
+from main.models import Category, Product
+
+
+def _worker_init():
+    django.setup()
+
+
+def _process(name, overwrite):
+    return name, generate_variants(name, overwrite=overwrite)
+
+
+class Command(BaseCommand):
+    help = "Створює WebP-варіанти для наявних зображень товарів і категорій у кількох процесах."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 2)
+        parser.add_argument('--force', action='store_true', help='Перегенерувати наявні варіанти.')
+
+    def handle(self, *args, **options):
+        names = set(Product.objects.exclude(image='').values_list('image', flat=True))
+        names |= set(Category.objects.exclude(image='').values_list('image', flat=True))
+        # дочірнім процесам БД не потрібна; не передаємо їм відкриті з'єднання
+        connections.close_all()
+
+        done = 0
+        with ProcessPoolExecutor(max_workers=options['workers'], initializer=_worker_init) as pool:
+            futures = [pool.submit(_process, name, options['force']) for name in sorted(names)]
+            for future in as_completed(futures):
+                name, variants = future.result()
+                done += 1
+                self.stdout.write(f'[{done}/{len(futures)}] {name}: {len(variants)} варіант(и)')
+
+        self.stdout.write(self.style.SUCCESS(f'Оброблено зображень: {done}'))
@@ -0,0 +1,43 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from main.importing import KINDS, FeedError, import_feed
+
+
+class Command(BaseCommand):
+    help = "Імпортує категорії, товари або знижки з CSV/JSONL-фіду (upsert за slug)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Шлях до фіду.')
+        parser.add_argument('--kind', choices=KINDS, default='products')
+        parser.add_argument('--format', choices=('csv', 'jsonl'),
+                            help='Формат фіду (за замовчуванням — за розширенням файлу).')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+
+        def progress(stats):
+            if options['verbosity'] > 1:
+                elapsed = time.monotonic() - started
+                self.stdout.write(f'{stats["rows"]} рядків, {stats["rows"] / elapsed:.0f} рядків/с')
+
+        try:
+            importer = import_feed(
+                options['path'], options['kind'],
+                batch_size=options['batch_size'], fmt=options['format'], progress=progress,
+            )
+        except (FeedError, OSError) as e:
+            raise CommandError(e)
+
+        for line, message in importer.errors:
+            self.stderr.write(f'Рядок {line}: {message}')
+        stats = importer.stats
+        elapsed = time.monotonic() - started
+        rate = stats['rows'] / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f'Рядків: {stats["rows"]} (створено {stats["created"]}, оновлено {stats["updated"]}, '
+            f'без змін {stats["unchanged"]}, помилок {stats["errors"]}) '
+            f'за {elapsed:.1f} с — {rate:.0f} рядків/с'
+        ))
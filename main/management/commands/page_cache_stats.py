@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from main.page_cache import page_cache_stats
+
+
+class Command(BaseCommand):
+    help = "Показує кількість влучань/промахів кешу сторінок каталогу."
+
+    def add_arguments(self, parser):
+        parser.add_argument('families', nargs='*', default=['product_list'])
+
+    def handle(self, *args, **options):
+        for family in options['families']:
+            stats = page_cache_stats(family)
+            total = stats['hit'] + stats['miss']
+            ratio = stats['hit'] / total * 100 if total else 0
+            self.stdout.write(f"{family}: hit={stats['hit']} miss={stats['miss']} ({ratio:.1f}% hit)")
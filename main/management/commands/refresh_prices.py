@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from discounts.pricing import refresh_due_prices, refresh_in_batches
+from main.models import Product
+
+
+class Command(BaseCommand):
+    help = "Перераховує ефективні ціни товарів, у яких минула межа дії знижки (запускати з cron)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Перерахувати всі товари.')
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        if options['all']:
+            total = refresh_in_batches(Product.objects.all(), now, options['batch_size'])
+        else:
+            total = refresh_due_prices(now, options['batch_size'])
+
+        self.stdout.write(self.style.SUCCESS(f'Оновлено цін: {total}'))
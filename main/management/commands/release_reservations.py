@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from main.stock import release_expired_reservations
+
+
+class Command(BaseCommand):
+    help = "Повертає на склад прострочені резерви товарів (запускати з cron щохвилини)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        released = release_expired_reservations(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Звільнено резервів: {released}'))
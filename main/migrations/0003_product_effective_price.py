@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:01
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def backfill_effective_price(apps, schema_editor):
+    # Без знижок ефективна ціна = ціна. Товари зі знижками позначаємо застарілими:
+    # до запуску refresh_prices вони рахуються "на льоту", як і раніше.
+    Product = apps.get_model('main', 'Product')
+    Product.objects.update(effective_price=models.F('price'))
+    Product.objects.filter(discounts__isnull=False).update(price_valid_until=timezone.now())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('discounts', '0001_initial'),
+        ('main', '0002_product_detailed_description'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='active_discount',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='discounts.discount'),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='effective_price',
+            field=models.DecimalField(db_index=True, decimal_places=2, default=0, editable=False, max_digits=10),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='price_valid_until',
+            field=models.DateTimeField(blank=True, db_index=True, editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_effective_price, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,51 @@
+import html
+
+from django.db import migrations
+from django.utils.html import strip_tags
+
+# Знімок схеми з main/search.py на момент міграції
+SEARCH_TABLE = 'main_product_search'
+CREATE_TABLE_SQL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5("
+    "name, description, details, category, "
+    "tokenize = 'unicode61 remove_diacritics 2')"
+)
+DROP_TABLE_SQL = f"DROP TABLE IF EXISTS {SEARCH_TABLE}"
+
+
+def html_to_text(value):
+    return html.unescape(strip_tags(value or '')).strip()
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    Product = apps.get_model('main', 'Product')
+    schema_editor.execute(CREATE_TABLE_SQL)
+    rows = [
+        (p.id, p.name, p.description, html_to_text(p.detailed_description),
+         p.category.name if p.category_id else '')
+        for p in Product.objects.select_related('category')
+    ]
+    with schema_editor.connection.cursor() as cursor:
+        cursor.executemany(
+            f"INSERT INTO {SEARCH_TABLE} (rowid, name, description, details, category) "
+            "VALUES (%s, %s, %s, %s, %s)",
+            rows,
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(DROP_TABLE_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0003_product_effective_price'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
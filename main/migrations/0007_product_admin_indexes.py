@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:19
+
+import django.db.models.functions.comparison
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('discounts', '0002_promocodeusage_used_at_idx'),
+        ('main', '0006_product_rating_aggregates'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['created_at', 'id'], name='product_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(
+                django.db.models.functions.comparison.Collate('name', 'NOCASE'),
+                name='product_name_prefix_idx',
+            ),
+        ),
+    ]
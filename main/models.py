@@ -1,10 +1,12 @@
 # main/models.py
 from decimal import Decimal
 
+from django.conf import settings
 from django.db import models
+from django.db.models.functions import Collate
 from django.urls import reverse
+from django.utils import timezone
 from ckeditor_uploader.fields import RichTextUploadingField
-from django.db.models import Avg, Count
 
 
 class Category(models.Model):
@@ -26,6 +28,18 @@ class Category(models.Model):
         return reverse("main:product_list_by_category", args=[self.slug])
 
 
+# Поля зі знімком ціни, які перераховуються разом
+PRICING_FIELDS = ('effective_price', 'active_discount', 'price_valid_until')
+
+
+def best_discount(price, discounts):
+    """Знижка з мінімальною ціною за 1 шт.; при рівності — перша в порядку discounts."""
+    discounts = list(discounts)
+    if not discounts:
+        return None
+    return min(discounts, key=lambda d: d.get_discounted_price(price, 1))
+
+
 class Product(models.Model):
     category = models.ForeignKey(
         'Category', on_delete=models.CASCADE, related_name='products',
@@ -44,12 +58,46 @@ class Product(models.Model):
     views = models.IntegerField(default=0)
     featured = models.BooleanField(default=False)
     is_available = models.BooleanField(default=True)
+    # Залишок на складі без активних резервів (див. main/stock.py); порожнє — облік не ведеться
+    stock = models.PositiveIntegerField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Знімок ціни з урахуванням найкращої знижки — з нього рендеряться й сортуються
+    # всі ціни (оновлюється сигналами Discount, а коли минає межа дії знижки —
+    # discounts.middleware.FreshPricesMiddleware чи командою refresh_prices)
+    effective_price = models.DecimalField(
+        max_digits=10, decimal_places=2, default=0, editable=False, db_index=True
+    )
+    active_discount = models.ForeignKey(
+        'discounts.Discount', on_delete=models.SET_NULL, related_name='+',
+        null=True, blank=True, editable=False
+    )
+    price_valid_until = models.DateTimeField(null=True, blank=True, editable=False, db_index=True)
+
+    # Агрегати активних відгуків (підтримуються сигналами reviews, див. reviews/ratings.py)
+    rating_avg = models.FloatField(default=0, editable=False)
+    rating_count = models.PositiveIntegerField(default=0, editable=False)
+    rating_1 = models.PositiveIntegerField(default=0, editable=False)
+    rating_2 = models.PositiveIntegerField(default=0, editable=False)
+    rating_3 = models.PositiveIntegerField(default=0, editable=False)
+    rating_4 = models.PositiveIntegerField(default=0, editable=False)
+    rating_5 = models.PositiveIntegerField(default=0, editable=False)
+
     class Meta:
         verbose_name = "Товар"
         verbose_name_plural = "Товари"
+        # Покривають фільтр каталогу + сортування з tiebreaker по id (keyset-пагінація)
+        indexes = [
+            models.Index(fields=["is_available", "category", "created_at", "id"], name="product_list_created_idx"),
+            models.Index(fields=["is_available", "category", "views", "id"], name="product_list_views_idx"),
+            models.Index(fields=["is_available", "category", "effective_price", "id"], name="product_list_price_idx"),
+            models.Index(fields=["is_available", "category", "name", "id"], name="product_list_name_idx"),
+            # changelist адмінки (ordering -created_at)
+            models.Index(fields=["created_at", "id"], name="product_created_idx"),
+            # пошук в адмінці за префіксом назви (^name -> LIKE, регістронезалежний у SQLite)
+            models.Index(Collate("name", "NOCASE"), name="product_name_prefix_idx"),
+        ]
 
     def __str__(self):
         return self.name
@@ -57,27 +105,68 @@ class Product(models.Model):
     def get_absolute_url(self):
         return reverse("main:product_detail", args=[self.id, self.slug])
 
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'price' in update_fields:
+            self.refresh_pricing(save=False)
+            if update_fields is not None:
+                kwargs['update_fields'] = set(update_fields) | set(PRICING_FIELDS)
+        super().save(*args, **kwargs)
+
+    def apply_pricing(self, discounts, now=None):
+        """Заповнює знімок ціни з переданих знижок товару (без запитів до БД)."""
+        now = now or timezone.now()
+        valid = []
+        boundaries = []
+        for d in discounts:
+            if not d.is_active:
+                continue
+            if d.start_date > now:
+                boundaries.append(d.start_date)
+            elif d.end_date >= now:
+                valid.append(d)
+                boundaries.append(d.end_date)
+
+        best = best_discount(self.price, valid)
+
+        self.active_discount = best
+        self.set_active_discount(best)
+        self.effective_price = best.get_discounted_price(self.price, 1) if best else self.price
+        self.price_valid_until = min(boundaries, default=None)
+
+    def refresh_pricing(self, save=True):
+        """Перераховує знімок ціни за поточними знижками."""
+        now = timezone.now()
+        discounts = []
+        if self.pk:
+            discounts = self.discounts.filter(is_active=True, end_date__gte=now)
+        self.apply_pricing(discounts, now)
+        if save:
+            super().save(update_fields=PRICING_FIELDS)
+
+    def set_active_discount(self, discount):
+        """Запам'ятовує вже обчислену найкращу знижку (див. discounts.pricing)."""
+        self._active_discount_cache = discount
+
     def get_average_rating(self):
-        value = self.reviews.filter(is_active=True).aggregate(avg=Avg('rating'))['avg']
-        return round(value or 0, 2)
+        return round(self.rating_avg or 0, 2)
 
     def get_reviews_count(self):
-        return self.reviews.filter(is_active=True).count()
+        return self.rating_count
 
     def get_rating_distribution(self):
-        dist = {i: 0 for i in range(1, 6)}
-        qs = self.reviews.filter(is_active=True).values('rating').annotate(c=Count('rating'))
-        for row in qs:
-            dist[row['rating']] = row['c']
-        return dist
+        return {i: getattr(self, f'rating_{i}') for i in range(1, 6)}
 
     @property
     def get_active_discount(self):
-        """Найкраща активна знижка або None."""
-        discounts = [d for d in self.discounts.all() if d.is_valid()]
-        if not discounts:
-            return None
-        return min(discounts, key=lambda d: d.get_discounted_price(self.price, 1))
+        """Найкраща активна знижка зі знімка ціни або None."""
+        try:
+            return self._active_discount_cache
+        except AttributeError:
+            pass
+        discount = self.active_discount
+        self.set_active_discount(discount)
+        return discount
 
     @property
     def has_active_discount(self):
@@ -85,10 +174,7 @@ class Product(models.Model):
 
     @property
     def get_discounted_price(self):
-        discount = self.get_active_discount
-        if not discount:
-            return self.price
-        return discount.get_discounted_price(self.price, 1)
+        return self.effective_price
 
     @property
     def get_discount_percentage(self):
@@ -102,3 +188,19 @@ class Product(models.Model):
             saved = discount.calculate_discount(price, 1)
             return (saved / price * 100).quantize(Decimal('0.01'))
         return Decimal('0')
+
+
+class StockReservation(models.Model):
+    """Товар, відкладений під оформлення замовлення; вже списаний з Product.stock до продажу чи закінчення строку."""
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='reservations')
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='stock_reservations')
+    quantity = models.PositiveIntegerField()
+    expires_at = models.DateTimeField(db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Резерв товару"
+        verbose_name_plural = "Резерви товарів"
+
+    def __str__(self):
+        return f'{self.product} × {self.quantity} до {self.expires_at:%H:%M}'
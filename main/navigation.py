@@ -0,0 +1,33 @@
+from django.core.cache import cache
+from django.db.models import Count
+
+from .caching import CATALOG_GENERATION, NAV_GENERATION, get_generation
+from .models import Category, Product
+
+NAV_CACHE_TIMEOUT = 60 * 60
+
+
+def nav_categories():
+    """Активні категорії для меню; з кешу, доки не зміниться покоління категорій."""
+    key = f'nav:categories:{get_generation(NAV_GENERATION)}'
+    categories = cache.get(key)
+    if categories is None:
+        categories = list(Category.objects.filter(is_active=True).order_by("name"))
+        cache.set(key, categories, NAV_CACHE_TIMEOUT)
+    return categories
+
+
+def category_product_counts():
+    """{category_id: кількість доступних товарів} одним GROUP BY; None — товари без категорії."""
+    key = f'nav:product_counts:{get_generation(CATALOG_GENERATION)}'
+    counts = cache.get(key)
+    if counts is None:
+        rows = (
+            Product.objects.filter(is_available=True)
+            .order_by()
+            .values_list('category_id')
+            .annotate(total=Count('id'))
+        )
+        counts = dict(rows)
+        cache.set(key, counts, NAV_CACHE_TIMEOUT)
+    return counts
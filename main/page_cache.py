@@ -0,0 +1,148 @@
+"""
+Кеш цілих сторінок каталогу для анонімних відвідувачів.
+
+Кешуються лише запити без cookie сесії, кошика та повідомлень: у них порожній кошик,
+немає flash-повідомлень і персональних даних у шапці, тож HTML однаковий
+для всіх. Ключ — нормалізовані параметри (категорія, q, sort, page, cursor)
+плюс покоління каталогу й навігації; TTL обрізається до найближчої межі дії
+знижки, щоб ціни не застарівали.
+"""
+import hashlib
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.cache import patch_vary_headers
+
+from .caching import CATALOG_GENERATION, NAV_GENERATION, get_generation
+from .facets import FACET_PARAMS
+
+# Параметри запиту, від яких залежить сторінка каталогу; решта (utm_* тощо) ігнорується
+PAGE_PARAMS = ('q', 'sort', 'page', 'cursor', *FACET_PARAMS)
+
+BOUNDARY_CACHE_KEY = 'pagecache:next_discount_boundary'
+
+
+def _is_cacheable_request(request):
+    if request.method not in ('GET', 'HEAD'):
+        return False
+    cookies = request.COOKIES
+    return not {settings.SESSION_COOKIE_NAME, settings.CART_COOKIE_NAME, 'messages'} & cookies.keys()
+
+
+def _page_key(family, request, view_kwargs):
+    parts = [family]
+    parts += [f'{name}={value}' for name, value in sorted(view_kwargs.items())]
+    parts += [f'{name}={request.GET.get(name, "").strip()}' for name in PAGE_PARAMS]
+    parts += [str(get_generation(CATALOG_GENERATION)), str(get_generation(NAV_GENERATION))]
+    digest = hashlib.md5('|'.join(parts).encode()).hexdigest()
+    return f'pagecache:{family}:{digest}'
+
+
+def next_boundary():
+    from discounts.pricing import next_discount_boundary
+
+    key = f'{BOUNDARY_CACHE_KEY}:{get_generation(CATALOG_GENERATION)}'
+    boundary = cache.get(key)
+    now = timezone.now()
+    if boundary is None or (boundary and boundary <= now):
+        boundary = next_discount_boundary(now) or False
+        cache.set(key, boundary, settings.PAGE_CACHE_TIMEOUT)
+    return boundary or None
+
+
+def _timeout():
+    timeout = settings.PAGE_CACHE_TIMEOUT
+    boundary = next_boundary()
+    if boundary:
+        seconds = int((boundary - timezone.now()).total_seconds())
+        timeout = max(0, min(timeout, seconds))
+    return timeout
+
+
+def _count(family, outcome):
+    key = f'pagecache:stats:{family}:{outcome}'
+    if not cache.add(key, 1, None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, None)
+
+
+def page_cache_stats(family):
+    return {
+        outcome: cache.get(f'pagecache:stats:{family}:{outcome}', 0)
+        for outcome in ('hit', 'miss')
+    }
+
+
+def _cached_response(family, cached):
+    _count(family, 'hit')
+    content, content_type = cached
+    response = HttpResponse(content, content_type=content_type)
+    response['X-Page-Cache'] = 'hit'
+    patch_vary_headers(response, ('Cookie',))
+    return response
+
+
+def _is_storable(request, response):
+    return (
+        response.status_code == 200
+        and not response.streaming
+        and not response.cookies
+        and not request.META.get('CSRF_COOKIE_NEEDS_UPDATE')
+    )
+
+
+def _mark_miss(response):
+    response['X-Page-Cache'] = 'miss'
+    patch_vary_headers(response, ('Cookie',))
+    return response
+
+
+def cache_anonymous_page(family):
+    """Декоратор view (sync або async): кешує відповідь для анонімних запитів без сесії."""
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                if not _is_cacheable_request(request):
+                    return await view(request, *args, **kwargs)
+
+                key = _page_key(family, request, kwargs)
+                cached = await cache.aget(key)
+                if cached is not None:
+                    return _cached_response(family, cached)
+
+                _count(family, 'miss')
+                response = await view(request, *args, **kwargs)
+                if _is_storable(request, response):
+                    # _timeout може звернутися до БД за межею дії знижок
+                    timeout = await sync_to_async(_timeout)()
+                    if timeout > 0:
+                        await cache.aset(key, (response.content, response['Content-Type']), timeout)
+                return _mark_miss(response)
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if not _is_cacheable_request(request):
+                return view(request, *args, **kwargs)
+
+            key = _page_key(family, request, kwargs)
+            cached = cache.get(key)
+            if cached is not None:
+                return _cached_response(family, cached)
+
+            _count(family, 'miss')
+            response = view(request, *args, **kwargs)
+            if _is_storable(request, response):
+                timeout = _timeout()
+                if timeout > 0:
+                    cache.set(key, (response.content, response['Content-Type']), timeout)
+            return _mark_miss(response)
+        return wrapper
+    return decorator
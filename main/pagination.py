@@ -0,0 +1,119 @@
+"""
+Keyset (cursor) пагінація для каталогу.
+
+Замість OFFSET + COUNT(*) кожна сторінка вибирається умовою
+"(колонка, id) після останнього показаного рядка", тож глибокі сторінки
+не повільніші за першу, а загальна кількість результатів не рахується.
+Курсор — непрозорий base64-токен з напрямком і значеннями ключа.
+"""
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class CursorPage:
+    """Сторінка keyset-пагінації. paginator = None, щоб шаблони відрізняли її від Page."""
+
+    paginator = None
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+
+def encode_cursor(direction, values):
+    raw = json.dumps([direction, *values], separators=(',', ':'), default=str)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, ValueError, UnicodeDecodeError):
+        raise InvalidCursor(token)
+    if not isinstance(data, list) or len(data) != 3 or data[0] not in ('n', 'p'):
+        raise InvalidCursor(token)
+    return data[0], data[1:]
+
+
+def _keyset_filter(field_name, descending, value, pk):
+    """Рядки, що йдуть після (value, pk) у порядку (field, id)."""
+    op = 'lt' if descending else 'gt'
+    return Q(**{f'{field_name}__{op}': value}) | Q(**{field_name: value, f'id__{op}': pk})
+
+
+def _key_value(obj, name):
+    return obj[name] if isinstance(obj, dict) else getattr(obj, name)
+
+
+def paginate_by_cursor(queryset, ordering, cursor=None, per_page=6):
+    """
+    Повертає CursorPage для queryset, відсортованого за ordering
+    (одне поле, напр. "-created_at"); id використовується як унікальний tiebreaker.
+    Працює і з values()-запитами, якщо в них є поле сортування та id.
+    """
+    descending = ordering.startswith('-')
+    field_name = ordering.lstrip('-')
+    model_field = queryset.model._meta.get_field(field_name)
+
+    direction, key = 'n', None
+    if cursor:
+        try:
+            direction, (raw_value, raw_pk) = decode_cursor(cursor)
+            key = (model_field.to_python(raw_value), int(raw_pk))
+        except (InvalidCursor, TypeError, ValueError, ValidationError):
+            direction, key = 'n', None
+
+    backwards = direction == 'p'
+    # Для попередньої сторінки йдемо у зворотному порядку і потім розвертаємо
+    scan_descending = descending != backwards
+    prefix = '-' if scan_descending else ''
+    qs = queryset.order_by(f'{prefix}{field_name}', f'{prefix}id')
+    if key is not None:
+        qs = qs.filter(_keyset_filter(field_name, scan_descending, *key))
+
+    rows = list(qs[:per_page + 1])
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    if backwards:
+        rows.reverse()
+
+    def cursor_for(obj, to):
+        return encode_cursor(to, [_key_value(obj, field_name), _key_value(obj, 'id')])
+
+    next_cursor = previous_cursor = None
+    if rows:
+        if backwards:
+            next_cursor = cursor_for(rows[-1], 'n')
+            if has_more:
+                previous_cursor = cursor_for(rows[0], 'p')
+        else:
+            if has_more:
+                next_cursor = cursor_for(rows[-1], 'n')
+            if key is not None:
+                previous_cursor = cursor_for(rows[0], 'p')
+    return CursorPage(rows, next_cursor, previous_cursor)
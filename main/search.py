@@ -0,0 +1,146 @@
+"""
+Повнотекстовий пошук по каталогу на SQLite FTS5.
+
+Індекс main_product_search (rowid = id товару) містить назву, короткий опис,
+текст детального опису без HTML та назву категорії. Синхронізується сигналами
+(main/signals.py), повністю перебудовується командою rebuild_search_index.
+На інших СУБД пошук працює як раніше — через icontains.
+"""
+import html
+import re
+
+from django.db import connection
+from django.db.models import FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+from django.utils.html import strip_tags
+
+SEARCH_TABLE = 'main_product_search'
+
+# Ваги колонок для bm25: name, description, details, category
+BM25_WEIGHTS = (10.0, 4.0, 1.0, 2.0)
+
+CREATE_TABLE_SQL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5("
+    "name, description, details, category, "
+    "tokenize = 'unicode61 remove_diacritics 2')"
+)
+DROP_TABLE_SQL = f"DROP TABLE IF EXISTS {SEARCH_TABLE}"
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def fts_enabled():
+    return connection.vendor == 'sqlite'
+
+
+def html_to_text(value):
+    return html.unescape(strip_tags(value or '')).strip()
+
+
+def product_document(product, category_name=None):
+    """Рядок індексу для товару: (id, name, description, details, category)."""
+    if category_name is None:
+        category_name = product.category.name if product.category_id else ''
+    return (
+        product.id,
+        product.name,
+        product.description,
+        html_to_text(product.detailed_description),
+        category_name,
+    )
+
+
+def index_products(products):
+    """Додає/оновлює товари в індексі."""
+    if not fts_enabled():
+        return
+    rows = [product_document(p) for p in products]
+    if not rows:
+        return
+    with connection.cursor() as cursor:
+        cursor.executemany(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = %s", [(r[0],) for r in rows])
+        cursor.executemany(
+            f"INSERT INTO {SEARCH_TABLE} (rowid, name, description, details, category) "
+            "VALUES (%s, %s, %s, %s, %s)",
+            rows,
+        )
+
+
+def remove_products(product_ids):
+    if not fts_enabled():
+        return
+    with connection.cursor() as cursor:
+        cursor.executemany(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = %s", [(pk,) for pk in product_ids])
+
+
+def rebuild_index(batch_size=1000):
+    """Перебудовує індекс з нуля. Повертає кількість проіндексованих товарів."""
+    from .models import Product
+
+    if not fts_enabled():
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(DROP_TABLE_SQL)
+        cursor.execute(CREATE_TABLE_SQL)
+
+    return index_queryset(Product.objects.all(), batch_size)
+
+
+def index_queryset(queryset, batch_size=1000):
+    """Індексує товари з queryset пакетами. Повертає кількість товарів."""
+    if not fts_enabled():
+        return 0
+    total = 0
+    batch = []
+    qs = queryset.select_related('category').order_by('id')
+    for product in qs.iterator(chunk_size=batch_size):
+        batch.append(product)
+        if len(batch) >= batch_size:
+            index_products(batch)
+            total += len(batch)
+            batch = []
+    index_products(batch)
+    return total + len(batch)
+
+
+def build_match_query(query):
+    """
+    Перетворює введений текст на безпечний FTS5-запит: кожне слово в лапках
+    з префіксним пошуком ("тел"* знайде «телефон»), слова поєднуються через AND.
+    """
+    tokens = _TOKEN_RE.findall(query)
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+def search_products(queryset, query):
+    """
+    Фільтрує queryset товарів за пошуковим запитом.
+    На SQLite додає анотацію search_rank (bm25, менше — релевантніше).
+    """
+    if not fts_enabled():
+        return queryset.filter(
+            Q(name__icontains=query)
+            | Q(description__icontains=query)
+            | Q(category__name__icontains=query)
+        )
+
+    match = build_match_query(query)
+    if not match:
+        return queryset.none().annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+    weights = ', '.join(str(w) for w in BM25_WEIGHTS)
+    return queryset.filter(
+        id__in=RawSQL(f"SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s", [match])
+    ).annotate(
+        search_rank=RawSQL(
+            f"SELECT bm25({SEARCH_TABLE}, {weights}) FROM {SEARCH_TABLE} "
+            f"WHERE {SEARCH_TABLE} MATCH %s AND rowid = main_product.id",
+            [match],
+        )
+    )
+
+
+def order_by_relevance(queryset):
+    if not fts_enabled():
+        return queryset.order_by('-created_at')
+    return queryset.order_by('search_rank', '-created_at')
@@ -0,0 +1,51 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .caching import CATALOG_GENERATION, NAV_GENERATION, bump_generation
+from .images import generate_variants
+from .models import Category, Product
+from .search import index_products, remove_products
+
+# Поля товару, що потрапляють у пошуковий індекс
+SEARCH_FIELDS = {'name', 'description', 'detailed_description', 'category'}
+
+
+@receiver(post_save, sender=Product)
+def index_product(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not SEARCH_FIELDS.intersection(update_fields):
+        return
+    index_products([instance])
+
+
+@receiver(post_delete, sender=Product)
+def unindex_product(sender, instance, **kwargs):
+    remove_products([instance.pk])
+
+
+@receiver(post_save, sender=Category)
+def reindex_category_products(sender, instance, created, **kwargs):
+    if created:
+        return
+    index_products(instance.products.select_related('category'))
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def invalidate_catalog_cache(sender, **kwargs):
+    bump_generation(CATALOG_GENERATION)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_navigation_cache(sender, **kwargs):
+    bump_generation(NAV_GENERATION, CATALOG_GENERATION)
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_save, sender=Category)
+def create_image_variants(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and 'image' not in update_fields:
+        return
+    if instance.image:
+        # для вже оброблених файлів — лише перевірка наявності варіантів
+        generate_variants(instance.image.name, instance.image.storage)
@@ -0,0 +1,148 @@
+"""
+Облік залишків: резерв під оформлення, продаж і повернення прострочених резервів.
+
+Product.stock — скільки ще можна продати (активні резерви вже відняті),
+тож каталог показує наявність за самим лічильником, не рахуючи резервів.
+Резерв — один UPDATE ... SET stock = stock - n WHERE stock >= n для всіх
+товарів одразу, без блокування таблиці: якщо хоч одного товару не вистачає,
+оновиться менше рядків, і транзакція відкочується. Резерв робиться на кроці
+підтвердження оформлення (orders.checkout.reserve_cart) і тримається
+STOCK_RESERVATION_TTL секунд або доки покупець не змінить кошик чи не піде
+(release_session_reservations); створення замовлення перетворює його на продаж
+(видаляє рядки StockReservation), а release_expired_reservations повертає
+прострочені резерви на склад пакетами. Товари з stock = NULL не обліковуються.
+"""
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, PositiveIntegerField, Value, When
+from django.utils import timezone
+
+from .caching import CATALOG_GENERATION, bump_generation_on_commit
+from .models import Product, StockReservation
+
+
+class OutOfStock(ValueError):
+    pass
+
+
+class ReservationExpired(ValueError):
+    pass
+
+
+def _per_product(quantities):
+    """CASE id WHEN ... THEN n END — кількість для кожного товару в одному виразі."""
+    return Case(
+        *(When(pk=pk, then=Value(quantity)) for pk, quantity in quantities.items()),
+        output_field=PositiveIntegerField(),
+    )
+
+
+def tracked_quantities(items):
+    """{id товару: кількість} для пар (product, quantity) — лише товари з обліком залишків."""
+    quantities = Counter()
+    for product, quantity in items:
+        if product.stock is not None:
+            quantities[product.pk] += quantity
+    return quantities
+
+
+def reserve_stock(user, items, ttl=None):
+    """
+    Резервує товари; items — пари (product, quantity). Повертає список
+    StockReservation (по одному на товар з обліком залишків) або кидає OutOfStock.
+    """
+    quantities = tracked_quantities(items)
+    if not quantities:
+        return []
+
+    ttl = settings.STOCK_RESERVATION_TTL if ttl is None else ttl
+    needed = _per_product(quantities)
+    try:
+        with transaction.atomic():
+            updated = Product.objects.filter(pk__in=list(quantities), stock__gte=needed).update(
+                stock=F('stock') - needed,
+            )
+            if updated < len(quantities):
+                raise OutOfStock
+            expires_at = timezone.now() + timedelta(seconds=ttl)
+            reservations = StockReservation.objects.bulk_create([
+                StockReservation(product_id=pk, user=user, quantity=quantity, expires_at=expires_at)
+                for pk, quantity in quantities.items()
+            ])
+    except OutOfStock:
+        short = Product.objects.filter(pk__in=list(quantities), stock__lt=needed).values_list('name', flat=True)
+        raise OutOfStock(f'Недостатньо на складі: {", ".join(short)}.')
+
+    if Product.objects.filter(pk__in=list(quantities), stock=0).exists():
+        # товар зникне з каталогу, коли оформлення закомітиться
+        bump_generation_on_commit(CATALOG_GENERATION)
+    return reservations
+
+
+def consume_reservations(reservations):
+    """Перетворює резерви на продаж: залишок уже списаний, лишається прибрати рядки."""
+    ids = [reservation.pk for reservation in reservations]
+    if not ids:
+        return
+    deleted, _ = StockReservation.objects.filter(pk__in=ids).delete()
+    if deleted < len(ids):
+        # частину вже повернув на склад release_expired_reservations
+        raise ReservationExpired('Час резерву товару минув, оформіть замовлення ще раз.')
+
+
+def _return_to_stock(reservations):
+    """
+    Видаляє резерви з queryset reservations і повертає їх кількість на склад.
+    Викликати в транзакції; skip_locked — рядки, які зараз продає
+    consume_reservations, не чіпаємо. Повертає кількість звільнених резервів.
+    """
+    rows = list(
+        reservations.select_for_update(skip_locked=True).values_list('id', 'product_id', 'quantity')
+    )
+    if not rows:
+        return 0
+    StockReservation.objects.filter(pk__in=[pk for pk, _, _ in rows]).delete()
+    quantities = Counter()
+    for _, product_id, quantity in rows:
+        quantities[product_id] += quantity
+    returned = _per_product(quantities)
+    Product.objects.filter(pk__in=list(quantities), stock__isnull=False).update(
+        stock=F('stock') + returned,
+    )
+    return len(rows)
+
+
+def release_reservations(reservation_ids):
+    """Одразу повертає на склад резерви з id reservation_ids (покупець підтверджує кошик заново)."""
+    if not reservation_ids:
+        return 0
+    with transaction.atomic():
+        released = _return_to_stock(StockReservation.objects.filter(pk__in=reservation_ids))
+    if released:
+        bump_generation_on_commit(CATALOG_GENERATION)
+    return released
+
+
+def release_session_reservations(session):
+    """Повертає на склад резерв підтвердження, записаний у сесії покупця."""
+    return release_reservations(session.pop(settings.STOCK_RESERVATIONS_SESSION_ID, None))
+
+
+def release_expired_reservations(batch_size=500, now=None):
+    """Повертає на склад прострочені резерви пакетами. Повертає кількість звільнених резервів."""
+    now = now or timezone.now()
+    released = 0
+    while True:
+        with transaction.atomic():
+            count = _return_to_stock(
+                StockReservation.objects.filter(expires_at__lt=now).order_by('expires_at', 'id')[:batch_size]
+            )
+        released += count
+        if count < batch_size:
+            break
+    if released:
+        bump_generation_on_commit(CATALOG_GENERATION)
+    return released
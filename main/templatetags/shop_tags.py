@@ -1,15 +1,21 @@
 from django import template
-from main.models import Product
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import get_template
+from django.utils.html import format_html
+from django.utils.safestring import mark_safe
+from main.images import image_variants
+from main.navigation import category_product_counts
 
 register = template.Library()
 
 @register.simple_tag
 def get_products_count(category=None):
     """Кількість доступних товарів (опц. у категорії)."""
-    qs = Product.objects.filter(is_available=True)
+    counts = category_product_counts()
     if category:
-        qs = qs.filter(category=category)
-    return qs.count()
+        return counts.get(getattr(category, 'pk', category), 0)
+    return sum(counts.values())
 
 @register.simple_tag
 def calculate_total(price, quantity):
@@ -32,3 +38,57 @@ def user_greeting(context):
 def show_product_card(p):
     """Відображає картку товару (передає 'p' у компонент)."""
     return {"p": p}
+
+
+def _card_cache_key(template_name, p):
+    discount = p.get_active_discount
+    return "card:{}:{}:{}:{}:{}:{}:{}".format(
+        template_name,
+        p.pk,
+        p.updated_at.isoformat() if p.updated_at else 0,
+        discount.pk if discount else 0,
+        p.get_discounted_price,
+        p.rating_count,
+        p.rating_avg,
+    )
+
+
+@register.simple_tag
+def render_product_cards(products, template_name="main/components/product_card.html"):
+    """
+    Рендерить картки товарів з кешу фрагментів: один get_many на всю сітку,
+    рендер і set_many лише для промахів. Ключ містить updated_at, знижку і рейтинг,
+    тож зміни товару одразу дають новий фрагмент.
+    """
+    products = list(products)
+    keys = [_card_cache_key(template_name, p) for p in products]
+    cached = cache.get_many(keys)
+
+    tpl = None
+    fresh = {}
+    parts = []
+    for key, p in zip(keys, products):
+        html = cached.get(key)
+        if html is None:
+            tpl = tpl or get_template(template_name)
+            html = fresh[key] = tpl.render({"p": p, "product": p})
+        parts.append(html)
+
+    if fresh:
+        cache.set_many(fresh, settings.CARD_CACHE_TIMEOUT)
+    return mark_safe("".join(parts))
+
+
+@register.simple_tag
+def responsive_img(image, alt="", sizes="(max-width: 640px) 100vw, 320px", css_class=""):
+    """<img> з srcset із WebP-варіантів; без варіантів — оригінал."""
+    if not image:
+        return ""
+    variants = image_variants(image)
+    if not variants:
+        return format_html('<img src="{}" alt="{}" class="{}" loading="lazy">', image.url, alt, css_class)
+    srcset = ", ".join(f"{url} {width}w" for width, url in variants.items())
+    return format_html(
+        '<img src="{}" srcset="{}" sizes="{}" alt="{}" class="{}" loading="lazy">',
+        next(iter(variants.values())), srcset, sizes, alt, css_class,
+    )
@@ -1,3 +1,64 @@
+from decimal import Decimal
+
 from django.test import TestCase
 
-# Create your tests here.
+from .models import Category, Product
+from .pagination import encode_cursor, paginate_by_cursor
+
+
+class CursorPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name='Тест', slug='test')
+        # однакові ціни — сторінки мусять розрізнятися за id
+        cls.products = [
+            Product.objects.create(
+                category=category, name=f'Товар {i}', slug=f'product-{i}', description='-',
+                price=Decimal(10 + i // 3), effective_price=Decimal(10 + i // 3),
+            )
+            for i in range(10)
+        ]
+
+    def _walk(self, ordering, per_page=4):
+        pages, cursor = [], None
+        while True:
+            page = paginate_by_cursor(Product.objects.all(), ordering, cursor, per_page)
+            pages.append(page)
+            if not page.has_next():
+                return pages
+            cursor = page.next_cursor
+
+    def _ids(self, page):
+        return [p.pk for p in page]
+
+    def test_forward_pages_cover_all_rows_once(self):
+        for ordering in ('price', '-price'):
+            with self.subTest(ordering=ordering):
+                pages = self._walk(ordering)
+                ids = [pk for page in pages for pk in self._ids(page)]
+                tiebreaker = '-id' if ordering.startswith('-') else 'id'
+                expected = list(Product.objects.order_by(ordering, tiebreaker).values_list('id', flat=True))
+                self.assertEqual(ids, expected)
+                self.assertEqual([len(page) for page in pages], [4, 4, 2])
+                self.assertFalse(pages[0].has_previous())
+
+    def test_previous_cursor_returns_previous_page(self):
+        pages = self._walk('-price')
+        for earlier, later in zip(pages, pages[1:]):
+            back = paginate_by_cursor(Product.objects.all(), '-price', later.previous_cursor, 4)
+            self.assertEqual(self._ids(back), self._ids(earlier))
+            self.assertTrue(back.has_next())
+        first = paginate_by_cursor(Product.objects.all(), '-price', pages[1].previous_cursor, 4)
+        self.assertFalse(first.has_previous())
+
+    def test_invalid_cursor_starts_from_first_page(self):
+        first = paginate_by_cursor(Product.objects.all(), 'price', None, 4)
+        for cursor in ('not-a-cursor', encode_cursor('x', [1, 2]), encode_cursor('n', ['abc', 'id'])):
+            with self.subTest(cursor=cursor):
+                page = paginate_by_cursor(Product.objects.all(), 'price', cursor, 4)
+                self.assertEqual(self._ids(page), self._ids(first))
+
+    def test_values_queryset(self):
+        page = paginate_by_cursor(Product.objects.values('id', 'price'), 'price', None, 4)
+        following = paginate_by_cursor(Product.objects.values('id', 'price'), 'price', page.next_cursor, 4)
+        self.assertEqual([row['id'] for row in following], [p.pk for p in self.products[4:8]])
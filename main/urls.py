@@ -1,12 +1,27 @@
-from django.urls import path
-from . import views
+from django.conf import settings
+from django.urls import path, re_path
+from . import api, async_views, feeds, views
 
 app_name = "main"
 
+# під ASGI каталог обслуговують async-версії в'юх
+catalog_views = async_views if settings.CATALOG_ASYNC_VIEWS else views
+
 urlpatterns = [
-    path("", views.product_list, name="product_list"),
-    path("category/<slug:category_slug>/", views.product_list, name="product_list_by_category"),
-    path("product/<int:id>/<slug:slug>/", views.product_detail, name="product_detail"),
+    path("", catalog_views.product_list, name="product_list"),
+    path("category/<slug:category_slug>/", catalog_views.product_list, name="product_list_by_category"),
+    path("product/<int:id>/<slug:slug>/", catalog_views.product_detail, name="product_detail"),
+    path("api/products/", api.product_list, name="api_product_list"),
+    path("api/products/<int:id>/", api.product_detail, name="api_product_detail"),
+    path("api/categories/", api.category_list, name="api_category_list"),
+    path("api/discounts/", api.discount_list, name="api_discount_list"),
+    path("sitemap.xml", feeds.sitemap_index_view, name="sitemap"),
+    path("sitemap-categories.xml", feeds.sitemap_categories_view, name="sitemap_categories"),
+    path("sitemap-categories.xml.gz", feeds.sitemap_categories_view, {"compress": True}),
+    path("sitemap-products-<int:number>.xml", feeds.sitemap_products_view, name="sitemap_products"),
+    path("sitemap-products-<int:number>.xml.gz", feeds.sitemap_products_view, {"compress": True}),
+    re_path(r"^feeds/merchant\.(?P<fmt>xml|csv)$", feeds.merchant_feed_view, name="merchant_feed"),
+    re_path(r"^feeds/merchant\.(?P<fmt>xml|csv)\.gz$", feeds.merchant_feed_view, {"compress": True}),
 ]
 
 
@@ -0,0 +1,110 @@
+"""
+Буферизований лічильник переглядів товарів (write-behind).
+
+Перегляди накопичуються в пам'яті процесу і раз на
+VIEW_COUNT_FLUSH_INTERVAL секунд записуються в БД одним UPDATE на пакет
+(views = views + CASE id WHEN ... END). Якщо процес впаде, втратиться не
+більше ніж один інтервал переглядів. Інтервал 0 — запис одразу (без буфера).
+"""
+import atexit
+import logging
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Case, F, IntegerField, Value, When
+
+from .caching import CATALOG_GENERATION, bump_generation_on_commit
+
+FLUSH_BATCH_SIZE = 500
+
+logger = logging.getLogger(__name__)
+
+
+class ViewCountBuffer:
+    def __init__(self):
+        self._pending = Counter()
+        self._lock = threading.Lock()
+        self._flusher = None
+
+    @property
+    def interval(self):
+        return getattr(settings, 'VIEW_COUNT_FLUSH_INTERVAL', 10)
+
+    def add(self, product_id, count=1):
+        with self._lock:
+            self._pending[product_id] += count
+        if self.interval <= 0:
+            self.flush()
+        else:
+            self._ensure_flusher()
+
+    def pending(self, product_id):
+        with self._lock:
+            return self._pending.get(product_id, 0)
+
+    def flush(self):
+        """Записує накопичені перегляди в БД. Повертає кількість оновлених товарів."""
+        from .models import Product
+
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+        if not pending:
+            return 0
+
+        items = list(pending.items())
+        written = 0
+        updated = 0
+        try:
+            for start in range(0, len(items), FLUSH_BATCH_SIZE):
+                batch = items[start:start + FLUSH_BATCH_SIZE]
+                delta = Case(
+                    *[When(id=pk, then=Value(count)) for pk, count in batch],
+                    default=Value(0),
+                    output_field=IntegerField(),
+                )
+                updated += Product.objects.filter(id__in=[pk for pk, _ in batch]).update(views=F('views') + delta)
+                written = start + len(batch)
+        except Exception:
+            # повертаємо незаписане в буфер, щоб не загубити при наступній спробі
+            with self._lock:
+                self._pending.update(dict(items[written:]))
+            raise
+        finally:
+            if updated:
+                # перегляди впливають на sort=popular і ETag списку
+                bump_generation_on_commit(CATALOG_GENERATION)
+        return len(pending)
+
+    def _ensure_flusher(self):
+        if self._flusher is not None and self._flusher.is_alive():
+            return
+        with self._lock:
+            if self._flusher is not None and self._flusher.is_alive():
+                return
+            self._flusher = threading.Thread(target=self._run, name='view-count-flusher', daemon=True)
+            self._flusher.start()
+
+    def _run(self):
+        while True:
+            time.sleep(max(self.interval, 1))
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Не вдалося записати лічильники переглядів')
+            finally:
+                connections.close_all()
+
+
+view_counts = ViewCountBuffer()
+atexit.register(view_counts.flush)
+
+
+def record_view(product_id):
+    view_counts.add(product_id)
+
+
+def pending_views(product_id):
+    return view_counts.pending(product_id)
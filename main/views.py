@@ -1,94 +1,56 @@
 from django.shortcuts import render, get_object_or_404
-from django.db.models import F, Q
-from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
 from cart.forms import CartAddProductForm
+from discounts.pricing import attach_active_discounts
+from .conditional import (
+    conditional_page, product_detail_etag, product_list_etag,
+)
+from .catalog import (
+    base_products, catalog_page, product_detail_context, product_reviews, related_for,
+)
+from .facets import build_facets, facet_counts, facet_query, selected_facets
 from .models import Product, Category
+from .page_cache import cache_anonymous_page
+from .view_counter import pending_views, record_view
 
-SORT_MAP = {
-    "new": "-created_at",
-    "old": "created_at",
-    "popular": "-views",
-    "price_low": "price",
-    "price_high": "-price",
-    "name": "name",
-}
 
+@conditional_page(product_list_etag)
+@cache_anonymous_page("product_list")
 def product_list(request, category_slug=None):
-    categories = Category.objects.filter(is_active=True).order_by("name")
     category = None
-    products = Product.objects.filter(is_available=True)
+    search_query = request.GET.get("q", "").strip()
+    products = base_products(search_query)
 
     if category_slug:
         category = get_object_or_404(Category, slug=category_slug, is_active=True)
-        products = products.filter(category=category)
-
-    search_query = request.GET.get("q", "").strip()
-    if search_query:
-        products = products.filter(
-            Q(name__icontains=search_query)
-            | Q(description__icontains=search_query)
-            | Q(category__name__icontains=search_query)
-        )
-
-    current_sort = request.GET.get("sort", "new")
-    products = products.order_by(SORT_MAP.get(current_sort, "-created_at"))
 
-    paginator = Paginator(products, 6)
-    page = request.GET.get("page", 1)
-    try:
-        products_page = paginator.page(page)
-    except PageNotAnInteger:
-        products_page = paginator.page(1)
-    except EmptyPage:
-        products_page = paginator.page(paginator.num_pages)
-
-    return render(
-        request,
-        "main/product_list.html",
-        {
-            "products": products_page,
-            "categories": categories,
-            "category": category,
-            "current_sort": current_sort,
-            "search_query": search_query,
-        },
-    )
+    # кількості фасетів — по базовому набору (доступні + пошук), одним запитом
+    selected = selected_facets(request.GET)
+    counts = facet_counts(products, category, search_query)
+    products_page, current_sort = catalog_page(request.GET, products, category, selected, search_query)
+
+    return render(request, "main/product_list.html", {
+        "products": products_page,
+        "category": category,
+        "current_sort": current_sort,
+        "search_query": search_query,
+        "facets": build_facets(request.GET, counts, selected),
+        "facet_query": facet_query(request.GET),
+    })
 
+@conditional_page(product_detail_etag)
 def product_detail(request, id, slug):
-    categories = Category.objects.filter(is_active=True).order_by("name")
-    product = get_object_or_404(Product, id=id, slug=slug, is_available=True)
-
-    # +1 перегляд (атомарно)
-    Product.objects.filter(pk=product.pk).update(views=F("views") + 1)
-    product.refresh_from_db(fields=["views"])
-
-    related_products = (
-        Product.objects.filter(is_available=True, category=product.category)
-        .exclude(id=product.id)
-        .order_by("-created_at")[:4]
+    product = get_object_or_404(
+        Product.objects.select_related("category"), id=id, slug=slug, is_available=True,
     )
 
-    # дані для блоку відгуків
-    reviews_qs = product.reviews.filter(is_active=True).select_related('author')
-
-    ctx = {
-        "product": product,
-        "related_products": related_products,
-        "categories": categories,
-        "reviews": reviews_qs,
-        "reviews_count": product.get_reviews_count(),
-        "average_rating": product.get_average_rating(),
-        "rating_distribution": product.get_rating_distribution(),
-        "user_review": (
-            reviews_qs.filter(author=request.user).first()
-            if request.user.is_authenticated else None
-        ),
-    }
+    # +1 перегляд: буферизується і записується в БД пакетами (main/view_counter.py)
+    record_view(product.pk)
+    product.views += pending_views(product.pk)
 
-    cart_product_form = CartAddProductForm()
-
-    return render(request, 'main/product_detail.html', {
-        'product': product,
-        'related_products': related_products,
-        'cart_product_form': cart_product_form,
-    })
+    related_products = related_for(product)
+    attach_active_discounts([product, *related_products])
+    context = product_detail_context(
+        product, related_products, product_reviews(product), request.user,
+    )
+    context["cart_product_form"] = CartAddProductForm()
+    return render(request, 'main/product_detail.html', context)
@@ -0,0 +1,174 @@
+"""
+Оформлення замовлення з переоціненого кошика (cart.pricing.PricedCart).
+
+Оформлення кошика — два кроки: reserve_cart (POST з кошика) відкладає
+товари на STOCK_RESERVATION_TTL, confirmed_cart лише читає резерв для
+сторінки підтвердження, checkout_cart створює замовлення й перетворює
+резерв на продаж. Зміна кошика чи вихід покупця повертають резерв на склад. Шапка Order, усі OrderItem
+(одним bulk_create), використання промокоду та списання резерву пишуться
+в одній транзакції, тож кількість запитів не залежить від кількості позицій.
+Ціни, знижки та частка промокоду фіксуються на позиціях.
+"""
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from cart.cart import Cart
+from discounts.models import PromoCodeUnavailable
+from main.models import StockReservation
+from main.stock import (
+    OutOfStock, ReservationExpired, consume_reservations, release_session_reservations, reserve_stock,
+    tracked_quantities,
+)
+from .models import Order, OrderItem
+
+
+class CheckoutError(ValueError):
+    pass
+
+
+class PromoCodeRejected(CheckoutError):
+    """Промокод став недійсним під час оформлення — його треба прибрати із сесії."""
+
+
+def allocate_promo(lines, promo_discount):
+    """Ділить знижку промокоду між позиціями пропорційно їх сумам; залишок округлення — останній."""
+    total = sum((line.total_price for line in lines), Decimal('0.00'))
+    shares = []
+    for line in lines[:-1]:
+        share = (promo_discount * line.total_price / total).quantize(Decimal('0.01')) if total else Decimal('0.00')
+        shares.append(share)
+    if lines:
+        shares.append(promo_discount - sum(shares, Decimal('0.00')))
+    return shares
+
+
+def _stock_items(priced):
+    return [(line.product, line.quantity) for line in priced.lines]
+
+
+def place_order(user, priced, reservations=None):
+    """
+    Створює оплачене замовлення user з позиціями priced. reservations — резерви
+    з кроку підтвердження; без них товари резервуються тут же (купівля в один клік).
+    """
+    if not priced.lines:
+        raise CheckoutError('Кошик порожній.')
+
+    with transaction.atomic():
+        if reservations is None:
+            try:
+                reservations = reserve_stock(user, _stock_items(priced))
+            except OutOfStock as e:
+                raise CheckoutError(str(e)) from e
+        else:
+            reserved = {r.product_id: r.quantity for r in reservations}
+            if reserved != tracked_quantities(_stock_items(priced)):
+                raise CheckoutError('Резерв товарів закінчився або кошик змінився — підтвердіть замовлення ще раз.')
+        order = Order.objects.create(
+            user=user,
+            quantity=len(priced),
+            total_price=priced.total,
+            discount_amount=priced.promo_discount,
+            final_price=priced.final_total,
+            promo_code=priced.promo_code or '',
+            status=Order.STATUS_PAID,  # в ДЗ можна вважати оплаченим
+        )
+        OrderItem.objects.bulk_create([
+            OrderItem(
+                order=order,
+                product=line.product,
+                quantity=line.quantity,
+                price=line.original_price,
+                discount=line.discount,
+                discount_amount=line.discount_amount,
+                promo_discount_amount=share,
+                total_price=line.total_price,
+                final_price=line.total_price - share,
+            )
+            for line, share in zip(priced.lines, allocate_promo(priced.lines, priced.promo_discount))
+        ])
+
+        # зафіксувати використання промокоду — один раз на замовлення
+        if priced.promo and priced.promo_discount > 0:
+            try:
+                priced.promo.redeem(user, priced.total, priced.promo_discount)
+            except PromoCodeUnavailable as e:
+                # ліміт вичерпав паралельний покупець — замовлення відкочується
+                raise PromoCodeRejected(str(e)) from e
+
+        try:
+            consume_reservations(reservations)
+        except ReservationExpired as e:
+            raise CheckoutError(str(e)) from e
+    return order
+
+
+def _priced_cart(request, cart, prune=True):
+    priced = cart.priced(request.session.get('promo_code'))
+    in_cart = {int(pk) for pk, item in cart.cart.items() if item['quantity'] > 0}
+    unavailable = in_cart - {line.product.pk for line in priced.lines}
+    if unavailable:
+        # товар зняли з продажу, поки він лежав у кошику
+        if not prune:
+            raise CheckoutError('Частина товарів більше недоступна — перевірте кошик.')
+        for pk in unavailable:
+            cart.storage.remove(pk)
+        raise CheckoutError('Частина товарів більше недоступна, кошик оновлено — перевірте його.')
+    if not priced.lines:
+        raise CheckoutError('Кошик порожній.')
+    return priced
+
+
+def reserve_cart(request):
+    """
+    Відкладає товари кошика й запам'ятовує резерв у сесії; попередній резерв
+    сесії повертається на склад. Повертає список резервів.
+    """
+    release_session_reservations(request.session)
+    priced = _priced_cart(request, Cart(request))
+    try:
+        reservations = reserve_stock(request.user, _stock_items(priced))
+    except OutOfStock as e:
+        raise CheckoutError(str(e)) from e
+    request.session[settings.STOCK_RESERVATIONS_SESSION_ID] = [r.pk for r in reservations]
+    return reservations
+
+
+def confirmed_cart(request):
+    """
+    Сторінка підтвердження: кошик і його резерв без жодних змін у БД.
+    Повертає (PricedCart, резерви) або кидає CheckoutError, якщо кошик треба
+    підтвердити заново (резерву немає, він прострочений або кошик змінився).
+    """
+    reserved_ids = request.session.get(settings.STOCK_RESERVATIONS_SESSION_ID)
+    if reserved_ids is None:
+        raise CheckoutError('Підтвердіть замовлення з кошика.')
+    priced = _priced_cart(request, Cart(request), prune=False)
+    reservations = list(StockReservation.objects.filter(pk__in=reserved_ids, user=request.user))
+    now = timezone.now()
+    if (
+        len(reservations) < len(reserved_ids)
+        or any(r.expires_at <= now for r in reservations)
+        or {r.product_id: r.quantity for r in reservations} != tracked_quantities(_stock_items(priced))
+    ):
+        raise CheckoutError('Резерв товарів закінчився або кошик змінився — підтвердіть замовлення ще раз.')
+    return priced, reservations
+
+
+def checkout_cart(request):
+    """Оформлює кошик із резервом reserve_cart і очищає його разом із промокодом у сесії."""
+    cart = Cart(request)
+    priced = _priced_cart(request, cart)
+    reservations = list(StockReservation.objects.filter(
+        pk__in=request.session.get(settings.STOCK_RESERVATIONS_SESSION_ID, []), user=request.user,
+    ))
+    with transaction.atomic():
+        order = place_order(request.user, priced, reservations)
+        # резерв уже проданий, тож clear() лише прибере його id із сесії
+        cart.clear()
+    request.session.pop('promo_code', None)
+    request.session.pop('promo_discount', None)
+    return order
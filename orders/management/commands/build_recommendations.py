@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from orders.recommendations import update_recommendations
+
+
+class Command(BaseCommand):
+    help = "Оновлює таблицю \"разом з цим купують\" з нових замовлень (інкрементально)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--window-days', type=int, default=30,
+                            help='Максимальний проміжок між покупками, що утворюють пару.')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--rebuild', action='store_true', help='Перерахувати з нуля.')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        processed = update_recommendations(
+            window_days=options['window_days'],
+            batch_size=options['batch_size'],
+            rebuild=options['rebuild'],
+        )
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(f'Оброблено замовлень: {processed} за {elapsed:.1f} с'))
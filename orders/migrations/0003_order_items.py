@@ -0,0 +1,60 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:32
+
+from decimal import Decimal
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def copy_orders_to_items(apps, schema_editor):
+    # Старі замовлення мали один товар: переносимо його в позицію з тими ж сумами
+    Order = apps.get_model('orders', 'Order')
+    OrderItem = apps.get_model('orders', 'OrderItem')
+    items = []
+    for order in Order.objects.filter(product__isnull=False, items__isnull=True).iterator(chunk_size=1000):
+        items.append(OrderItem(
+            order_id=order.id,
+            product_id=order.product_id,
+            quantity=order.quantity,
+            price=(order.total_price / (order.quantity or 1)).quantize(Decimal('0.01')),
+            promo_discount_amount=order.discount_amount,
+            total_price=order.total_price,
+            final_price=order.final_price,
+        ))
+        if len(items) >= 1000:
+            OrderItem.objects.bulk_create(items)
+            items = []
+    OrderItem.objects.bulk_create(items)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('discounts', '0002_promocodeusage_used_at_idx'),
+        ('main', '0007_product_admin_indexes'),
+        ('orders', '0002_copurchase'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='order',
+            name='product',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, to='main.product'),
+        ),
+        migrations.CreateModel(
+            name='OrderItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.PositiveIntegerField(default=1)),
+                ('price', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('discount_amount', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('promo_discount_amount', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('total_price', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('final_price', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('discount', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='discounts.discount')),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='orders.order')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='order_items', to='main.product')),
+            ],
+        ),
+        migrations.RunPython(copy_orders_to_items, migrations.RunPython.noop),
+    ]
@@ -14,7 +14,9 @@ class Order(models.Model):
     )
 
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
-    product = models.ForeignKey(Product, on_delete=models.PROTECT)
+    # лише для замовлень, створених до OrderItem; позиції тепер в items
+    product = models.ForeignKey(Product, on_delete=models.PROTECT, null=True, blank=True)
+    # загальна кількість одиниць у замовленні
     quantity = models.PositiveIntegerField(default=1)
 
     total_price = models.DecimalField(max_digits=10, decimal_places=2)
@@ -28,3 +30,47 @@ class Order(models.Model):
 
     def __str__(self):
         return f'#{self.id} {self.user} {self.final_price} грн'
+
+
+class OrderItem(models.Model):
+    """Позиція замовлення зі знімком цін на момент оформлення."""
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='items')
+    product = models.ForeignKey(Product, on_delete=models.PROTECT, related_name='order_items')
+    quantity = models.PositiveIntegerField(default=1)
+    # ціна за одиницю без знижок
+    price = models.DecimalField(max_digits=10, decimal_places=2)
+    discount = models.ForeignKey(
+        'discounts.Discount', on_delete=models.SET_NULL, null=True, blank=True, related_name='+',
+    )
+    discount_amount = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    # частка промокоду замовлення, що припадає на позицію
+    promo_discount_amount = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    # price * quantity - discount_amount
+    total_price = models.DecimalField(max_digits=10, decimal_places=2)
+    # total_price - promo_discount_amount
+    final_price = models.DecimalField(max_digits=10, decimal_places=2)
+
+    def __str__(self):
+        return f'{self.product} × {self.quantity}'
+
+
+class CoPurchase(models.Model):
+    """Скільки разів related купували тим самим користувачем поруч у часі з product."""
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='co_purchases')
+    related = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='co_purchased_with')
+    count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ['product', 'related']
+        indexes = [models.Index(fields=['product', '-count'], name='copurchase_top_idx')]
+
+    def __str__(self):
+        return f'{self.product} + {self.related} ({self.count})'
+
+
+class CoPurchaseState(models.Model):
+    """Позиція інкрементального перерахунку CoPurchase (один рядок)."""
+    last_order_id = models.PositiveBigIntegerField(default=0)
+    window_days = models.PositiveIntegerField(default=30)
+    updated_at = models.DateTimeField(auto_now=True)
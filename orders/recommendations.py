@@ -0,0 +1,112 @@
+"""
+"Разом з цим купують": попарні лічильники спільних покупок із історії замовлень.
+
+Пара (A, B) зараховується, коли той самий користувач купив A і B у межах
+window_days один від одного (зокрема в одному замовленні). Перерахунок
+інкрементальний — обробляються лише замовлення з id > CoPurchaseState.last_order_id.
+Лічильники зберігаються повністю (обрізані пари після наступного пакета
+почали б рахуватися з нуля), а топ обирається при читанні за індексом
+copurchase_top_idx.
+"""
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F
+
+from main.models import Product
+from .models import CoPurchase, CoPurchaseState, Order, OrderItem
+
+RELATED_LIMIT = 4
+
+
+def _pairs_for_batch(new_orders, window):
+    """Лічильник (product_id, related_id) для пакета нових замовлень."""
+    user_ids = {o['user_id'] for o in new_orders}
+    since = min(o['created_at'] for o in new_orders) - window
+    min_id, max_id = new_orders[0]['id'], new_orders[-1]['id']
+
+    # позиції замовлень користувачів пакета; позиції одного замовлення — теж пара
+    history = defaultdict(list)
+    rows = (
+        OrderItem.objects.filter(
+            order__user_id__in=user_ids, order__created_at__gte=since, order_id__lte=max_id,
+        )
+        .order_by('order_id', 'id')
+        .values('id', 'order_id', 'product_id', user_id=F('order__user_id'), created_at=F('order__created_at'))
+    )
+    for row in rows:
+        history[row['user_id']].append(row)
+
+    pairs = Counter()
+    for items in history.values():
+        for index, item in enumerate(items):
+            if item['order_id'] < min_id:
+                continue
+            for earlier in items[:index]:
+                if earlier['product_id'] == item['product_id']:
+                    continue
+                if abs(item['created_at'] - earlier['created_at']) > window:
+                    continue
+                pairs[(item['product_id'], earlier['product_id'])] += 1
+                pairs[(earlier['product_id'], item['product_id'])] += 1
+    return pairs
+
+
+def _merge_pairs(pairs):
+    product_ids = {p for p, _ in pairs}
+    existing = {
+        (row.product_id, row.related_id): row
+        for row in CoPurchase.objects.filter(product_id__in=product_ids)
+        if (row.product_id, row.related_id) in pairs
+    }
+    rows = []
+    for (product_id, related_id), n in pairs.items():
+        row = existing.get((product_id, related_id))
+        count = (row.count if row else 0) + n
+        rows.append(CoPurchase(product_id=product_id, related_id=related_id, count=count))
+    CoPurchase.objects.bulk_create(
+        rows,
+        batch_size=500,
+        update_conflicts=True,
+        unique_fields=['product', 'related'],
+        update_fields=['count', 'updated_at'],
+    )
+
+
+def update_recommendations(window_days=30, batch_size=1000, rebuild=False):
+    """Обробляє нові замовлення. Повертає кількість оброблених замовлень."""
+    window = timedelta(days=window_days)
+    state, _ = CoPurchaseState.objects.get_or_create(pk=1)
+    if rebuild or state.window_days != window_days:
+        CoPurchase.objects.all().delete()
+        state.last_order_id = 0
+        state.window_days = window_days
+
+    processed = 0
+    while True:
+        new_orders = list(
+            Order.objects.filter(id__gt=state.last_order_id)
+            .order_by('id')
+            .values('id', 'user_id', 'created_at')[:batch_size]
+        )
+        if not new_orders:
+            break
+        with transaction.atomic():
+            pairs = _pairs_for_batch(new_orders, window)
+            if pairs:
+                _merge_pairs(pairs)
+            state.last_order_id = new_orders[-1]['id']
+            state.save()
+        processed += len(new_orders)
+
+    state.save()
+    return processed
+
+
+def related_products(product, limit=RELATED_LIMIT):
+    """Товари, які найчастіше купують разом із product (один запит за індексом)."""
+    return list(
+        Product.objects.filter(is_available=True, co_purchased_with__product=product)
+        .order_by('-co_purchased_with__count')[:limit]
+    )
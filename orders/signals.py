@@ -0,0 +1,11 @@
+from django.contrib.auth.signals import user_logged_out
+from django.dispatch import receiver
+
+from main.stock import release_session_reservations
+
+
+@receiver(user_logged_out)
+def release_reservations_on_logout(sender, request, user, **kwargs):
+    # сесія зараз буде очищена — без цього резерв чекав би STOCK_RESERVATION_TTL
+    if request is not None:
+        release_session_reservations(request.session)
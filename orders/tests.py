@@ -1,3 +1,174 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from cart.pricing import price_cart
+from discounts.models import PromoCode
+from main.models import Category, Product, StockReservation
+from main.stock import release_expired_reservations
+from .checkout import CheckoutError, PromoCodeRejected, place_order
+from .models import Order, OrderItem
+
+
+class PlaceOrderTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('buyer', password='secret')
+        category = Category.objects.create(name='Тест', slug='test')
+        cls.products = [
+            Product.objects.create(
+                category=category, name=f'Товар {i}', slug=f'product-{i}', description='-',
+                price=Decimal('10.00'), effective_price=Decimal('10.00'),
+                # половина товарів з обліком залишків
+                stock=100 if i % 2 else None,
+            )
+            for i in range(10)
+        ]
+
+    def _priced(self, count):
+        return price_cart({product.pk: 2 for product in self.products[:count]})
+
+    def test_query_count_does_not_depend_on_lines(self):
+        small, large = self._priced(2), self._priced(10)
+        with CaptureQueriesContext(connection) as queries:
+            place_order(self.user, small)
+        with self.assertNumQueries(len(queries)):
+            order = place_order(self.user, large)
+        self.assertEqual(OrderItem.objects.filter(order=order).count(), 10)
+
+    def test_unavailable_product_is_not_priced(self):
+        Product.objects.filter(pk=self.products[0].pk).update(is_available=False)
+        with self.assertRaises(CheckoutError):
+            place_order(self.user, price_cart({self.products[0].pk: 1}))
+        self.assertFalse(Order.objects.exists())
+
+    def test_checkout_rejects_cart_with_unavailable_product(self):
+        self.client.force_login(self.user)
+        for product in self.products[:2]:
+            self.client.post(reverse('cart:cart_add', args=[product.pk]), {'quantity': 1})
+        Product.objects.filter(pk=self.products[0].pk).update(is_available=False)
+
+        response = self.client.post(reverse('orders:checkout_reserve'))
+
+        self.assertRedirects(response, reverse('cart:cart_detail'), fetch_redirect_response=False)
+        # недоступний товар прибрано з кошика, решту можна оформити
+        self.client.post(reverse('orders:checkout_reserve'))
+        self.client.post(reverse('orders:checkout'))
+        self.assertEqual(Order.objects.get().items.count(), 1)
+
+
+class CheckoutReservationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('buyer', password='secret')
+        category = Category.objects.create(name='Тест', slug='test')
+        cls.product = Product.objects.create(
+            category=category, name='Товар', slug='product', description='-',
+            price=Decimal('10.00'), effective_price=Decimal('10.00'), stock=5,
+        )
+
+    def setUp(self):
+        self.client.force_login(self.user)
+        self.client.post(reverse('cart:cart_add', args=[self.product.pk]), {'quantity': 2})
+
+    def _stock(self):
+        self.product.refresh_from_db()
+        return self.product.stock
+
+    def test_reserve_and_order_consumes(self):
+        response = self.client.post(reverse('orders:checkout_reserve'))
+        self.assertRedirects(response, reverse('orders:checkout'), fetch_redirect_response=False)
+        self.assertEqual(self._stock(), 3)
+        self.assertEqual(StockReservation.objects.count(), 1)
+
+        # повторне оформлення не резервує вдруге
+        self.client.post(reverse('orders:checkout_reserve'))
+        self.assertEqual(self._stock(), 3)
+        self.assertEqual(StockReservation.objects.count(), 1)
+
+        self.client.post(reverse('orders:checkout'))
+        self.assertTrue(Order.objects.exists())
+        self.assertFalse(StockReservation.objects.exists())
+        self.assertEqual(self._stock(), 3)
+
+    def test_confirmation_page_does_not_write(self):
+        response = self.client.get(reverse('orders:checkout'))
+        self.assertRedirects(response, reverse('cart:cart_detail'), fetch_redirect_response=False)
+        self.assertFalse(StockReservation.objects.exists())
+
+        self.client.post(reverse('orders:checkout_reserve'))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('orders:checkout'))
+        self.assertEqual(response.status_code, 200)
+        writes = [q['sql'] for q in queries if not q['sql'].lstrip().upper().startswith('SELECT')]
+        self.assertEqual(writes, [])
+
+    def test_cart_change_releases_reservation(self):
+        self.client.post(reverse('orders:checkout_reserve'))
+        self.client.post(reverse('cart:cart_add', args=[self.product.pk]), {'quantity': 1})
+
+        self.assertFalse(StockReservation.objects.exists())
+        self.assertEqual(self._stock(), 5)
+        response = self.client.get(reverse('orders:checkout'))
+        self.assertRedirects(response, reverse('cart:cart_detail'), fetch_redirect_response=False)
+
+    def test_cancel_and_logout_release_reservation(self):
+        self.client.post(reverse('orders:checkout_reserve'))
+        self.client.post(reverse('orders:checkout_cancel'))
+        self.assertEqual(self._stock(), 5)
+
+        self.client.post(reverse('orders:checkout_reserve'))
+        self.client.logout()
+        self.assertFalse(StockReservation.objects.exists())
+        self.assertEqual(self._stock(), 5)
+
+    def test_expired_reservation_is_released_and_order_rejected(self):
+        self.client.post(reverse('orders:checkout_reserve'))
+        release_expired_reservations(now=timezone.now() + timedelta(days=1))
+        self.assertEqual(self._stock(), 5)
+
+        response = self.client.post(reverse('orders:checkout'))
+
+        self.assertRedirects(response, reverse('cart:cart_detail'), fetch_redirect_response=False)
+        self.assertFalse(Order.objects.exists())
+        self.assertEqual(self._stock(), 5)
+
+
+class PromoCodeCheckoutTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('buyer', password='secret')
+        category = Category.objects.create(name='Тест', slug='test')
+        cls.product = Product.objects.create(
+            category=category, name='Товар', slug='product', description='-',
+            price=Decimal('100.00'), effective_price=Decimal('100.00'), stock=1,
+        )
+        now = timezone.now()
+        cls.promo = PromoCode.objects.create(
+            code='ONCE', discount_type=PromoCode.TYPE_FIXED, value=Decimal('10'),
+            start_date=now - timedelta(days=1), end_date=now + timedelta(days=1), usage_limit=1,
+        )
+
+    def test_exhausted_promo_is_rejected(self):
+        priced = price_cart({self.product.pk: 1}, self.promo.code)
+        # ліміт вичерпали між переоцінкою й оформленням
+        PromoCode.objects.filter(pk=self.promo.pk).update(used_count=1)
+        with self.assertRaises(PromoCodeRejected):
+            place_order(self.user, priced)
+
+    def test_buy_now_keeps_promo_on_other_errors(self):
+        self.client.force_login(self.user)
+        session = self.client.session
+        session['promo_code'] = self.promo.code
+        session.save()
+
+        self.client.post(reverse('orders:buy_now', args=[self.product.pk]), {'quantity': 2})
 
-# Create your tests here.
+        self.assertFalse(Order.objects.exists())
+        self.assertEqual(self.client.session.get('promo_code'), self.promo.code)
@@ -5,5 +5,8 @@ app_name = 'orders'
 
 urlpatterns = [
     path('buy/<int:product_id>/', views.buy_now, name='buy_now'),
+    path('checkout/', views.checkout, name='checkout'),
+    path('checkout/reserve/', views.checkout_reserve, name='checkout_reserve'),
+    path('checkout/cancel/', views.checkout_cancel, name='checkout_cancel'),
     path('success/<int:order_id>/', views.order_success, name='success'),
 ]
@@ -1,17 +1,26 @@
-from decimal import Decimal
-
+from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import get_object_or_404, redirect, render
 from django.http import Http404
+from django.views.decorators.http import require_POST
 
 from main.models import Product
-from discounts.models import PromoCode, PromoCodeUsage
+from cart.pricing import price_cart
+from main.stock import release_session_reservations
+from .checkout import (
+    CheckoutError, PromoCodeRejected, checkout_cart, confirmed_cart, place_order, reserve_cart,
+)
 from .models import Order
 
 
+def _drop_promo_code(request):
+    request.session.pop('promo_code', None)
+    request.session.pop('promo_discount', None)
+
+
 @login_required
 def buy_now(request, product_id):
-    product = get_object_or_404(Product, id=product_id)
+    product = get_object_or_404(Product, id=product_id, is_available=True)
 
     if request.method == 'POST':
         # кількість з форми (або 1)
@@ -22,49 +31,17 @@ def buy_now(request, product_id):
         if quantity < 1:
             quantity = 1
 
-        total = (product.price or Decimal('0')) * quantity
-
-        # промокод з сесії (поклався в apply_promo_code)
-        code = request.session.get('promo_code')
-        discount_amount = Decimal('0.00')
-        promo = None
-
-        if code:
-            try:
-                promo = PromoCode.objects.get(code=code)
-                discount_amount = promo.apply_discount(total)
-            except PromoCode.DoesNotExist:
-                promo = None
-                discount_amount = Decimal('0.00')
-
-        final = total - discount_amount
-        if final < 0:
-            final = Decimal('0.00')
-
-        order = Order.objects.create(
-            user=request.user,
-            product=product,
-            quantity=quantity,
-            total_price=total,
-            discount_amount=discount_amount,
-            final_price=final,
-            promo_code=code or '',
-            status=Order.STATUS_PAID,  # в ДЗ можна вважати оплаченим
-        )
-
-        # зафіксувати використання промокоду
-        if promo and discount_amount > 0:
-            PromoCodeUsage.objects.create(
-                promo_code=promo,
-                user=request.user,
-                order_amount=total,
-                discount_amount=discount_amount,
-            )
-            promo.increment_usage()
-
-        # очистити промокод у сесії
-        request.session.pop('promo_code', None)
-        request.session.pop('promo_discount', None)
+        # промокод з сесії (поклався в apply_promo_code); ціни й знижки з урахуванням кількості
+        priced = price_cart({product.id: quantity}, request.session.get('promo_code'))
+        try:
+            order = place_order(request.user, priced)
+        except CheckoutError as e:
+            messages.error(request, str(e))
+            if isinstance(e, PromoCodeRejected):
+                _drop_promo_code(request)
+            return redirect(product.get_absolute_url())
+
+        _drop_promo_code(request)
 
         return redirect('orders:success', order_id=order.id)
 
@@ -74,6 +51,49 @@ def buy_now(request, product_id):
     })
 
 
+@login_required
+@require_POST
+def checkout_reserve(request):
+    """Кнопка «Оформити» в кошику: товари відкладаються на STOCK_RESERVATION_TTL."""
+    try:
+        reserve_cart(request)
+    except CheckoutError as e:
+        messages.error(request, str(e))
+        return redirect('cart:cart_detail')
+    return redirect('orders:checkout')
+
+
+@login_required
+@require_POST
+def checkout_cancel(request):
+    """Повернення з підтвердження до кошика: резерв одразу повертається на склад."""
+    release_session_reservations(request.session)
+    return redirect('cart:cart_detail')
+
+
+@login_required
+def checkout(request):
+    if request.method != 'POST':
+        # підтвердження лише показує резерв, зроблений checkout_reserve
+        try:
+            priced, reservations = confirmed_cart(request)
+        except CheckoutError as e:
+            messages.error(request, str(e))
+            return redirect('cart:cart_detail')
+        return render(request, 'orders/checkout_confirm.html', {
+            'cart': priced,
+            'reserved_until': min((r.expires_at for r in reservations), default=None),
+        })
+    try:
+        order = checkout_cart(request)
+    except CheckoutError as e:
+        messages.error(request, str(e))
+        if isinstance(e, PromoCodeRejected):
+            _drop_promo_code(request)
+        return redirect('cart:cart_detail')
+    return redirect('orders:success', order_id=order.id)
+
+
 @login_required
 # orders/views.py (unchanged)
 def order_success(request, order_id):
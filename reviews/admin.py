@@ -1,11 +1,17 @@
 from django.contrib import admin
+from main.large_admin import LargeTableAdminMixin
 from .models import Review
+from .ratings import recompute_ratings
 
 @admin.register(Review)
-class ReviewAdmin(admin.ModelAdmin):
+class ReviewAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     list_display = ('author', 'product', 'rating', 'title_preview', 'created_at', 'is_active', 'helpful_count')
     list_filter = ('rating', 'is_active', 'created_at')
-    search_fields = ('author__username', 'product__name', 'title', 'content')
+    list_select_related = ('author', 'product')
+    # назва товару й автор шукаються за префіксом (індекси), текст відгуку — як раніше
+    search_fields = ('^product__name', '^author__username', 'title', 'content')
+    autocomplete_fields = ('product', 'author')
+    sortable_by = ('created_at', 'rating', 'helpful_count')
     readonly_fields = ('created_at', 'updated_at')
     list_editable = ('is_active',)
     fieldsets = (
@@ -21,9 +27,17 @@ class ReviewAdmin(admin.ModelAdmin):
     actions = ['activate_reviews', 'deactivate_reviews']
 
     def activate_reviews(self, request, queryset):
-        queryset.update(is_active=True)
+        self._set_active(queryset, True)
     activate_reviews.short_description = 'Активувати вибрані відгуки'
 
     def deactivate_reviews(self, request, queryset):
-        queryset.update(is_active=False)
+        self._set_active(queryset, False)
     deactivate_reviews.short_description = 'Деактивувати вибрані відгуки'
+
+    def _set_active(self, queryset, value):
+        # update() оминає сигнали, тому агрегати рейтингу перераховуємо для зачеплених товарів
+        changed = queryset.exclude(is_active=value)
+        product_ids = set(changed.values_list('product_id', flat=True))
+        changed.update(is_active=value)
+        if product_ids:
+            recompute_ratings(product_ids)
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from reviews.ratings import recompute_ratings
+
+
+class Command(BaseCommand):
+    help = "Перераховує агрегати рейтингу товарів (rating_avg, rating_count, rating_1..5) з нуля."
+
+    def add_arguments(self, parser):
+        parser.add_argument('product_ids', nargs='*', type=int, help='Лише ці товари (за замовчуванням — усі).')
+
+    def handle(self, *args, **options):
+        updated = recompute_ratings(options['product_ids'] or None)
+        self.stdout.write(self.style.SUCCESS(f'Оновлено товарів: {updated}'))
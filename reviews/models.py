@@ -19,6 +19,8 @@ class Review(models.Model):
     class Meta:
         unique_together = ['product', 'author']  # один користувач — один відгук на товар
         ordering = ['-created_at']
+        # keyset-пагінація changelist в адмінці
+        indexes = [models.Index(fields=['created_at', 'id'], name='review_created_idx')]
 
     def __str__(self):
         return f'{self.product} — {self.author} ({self.rating}/5)'
@@ -0,0 +1,83 @@
+"""
+Денормалізовані агрегати рейтингу на main.Product.
+
+Сигнали (reviews/signals.py) застосовують інкрементальні зміни одним UPDATE
+з F-виразами; масові зміни (дії адмінки, команда recompute_ratings)
+перераховують агрегати з нуля одним UPDATE з корельованими підзапитами.
+Рейтинг входить у фасети й сортування каталогу, тому після коміту
+скидаємо покоління каталогу.
+"""
+from django.db.models import Avg, Count, F, FloatField, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Cast, Coalesce, NullIf
+
+from main.caching import CATALOG_GENERATION, bump_generation_on_commit
+from main.models import Product
+from .models import Review
+
+STAR_FIELDS = {star: f'rating_{star}' for star, _ in Review.RATING_CHOICES}
+
+
+def rating_contribution(product_id, rating, is_active):
+    """Внесок одного відгуку: {product_id: {зірки: 1}} або {} для неактивного."""
+    if not is_active or product_id is None:
+        return {}
+    return {product_id: {int(rating): 1}}
+
+
+def apply_rating_delta(product_id, deltas):
+    """Змінює лічильники зірок товару на deltas ({зірки: ±n}) і перераховує середнє."""
+    deltas = {star: n for star, n in deltas.items() if n}
+    if not deltas:
+        return
+
+    new_counts = {star: F(field) + deltas.get(star, 0) for star, field in STAR_FIELDS.items()}
+    total = sum(new_counts.values(), Value(0))
+    weighted = sum((star * expr for star, expr in new_counts.items()), Value(0))
+
+    updated = Product.objects.filter(pk=product_id).update(
+        rating_count=F('rating_count') + sum(deltas.values()),
+        rating_avg=Coalesce(
+            Cast(weighted, FloatField()) / NullIf(total, 0),
+            Value(0.0),
+            output_field=FloatField(),
+        ),
+        **{STAR_FIELDS[star]: F(STAR_FIELDS[star]) + n for star, n in deltas.items()},
+    )
+    if updated:
+        bump_generation_on_commit(CATALOG_GENERATION)
+
+
+def _active_reviews_subquery(aggregate, **filters):
+    qs = (
+        Review.objects.filter(product=OuterRef('pk'), is_active=True, **filters)
+        .order_by()
+        .values('product')
+        .annotate(value=aggregate)
+        .values('value')
+    )
+    return qs
+
+
+def recompute_ratings(product_ids=None):
+    """Перераховує агрегати з нуля одним UPDATE. Повертає кількість оновлених товарів."""
+    qs = Product.objects.all()
+    if product_ids is not None:
+        qs = qs.filter(id__in=set(product_ids))
+
+    def count(**filters):
+        return Coalesce(
+            Subquery(_active_reviews_subquery(Count('id'), **filters), output_field=IntegerField()),
+            Value(0),
+        )
+
+    updated = qs.update(
+        rating_count=count(),
+        rating_avg=Coalesce(
+            Subquery(_active_reviews_subquery(Avg('rating')), output_field=FloatField()),
+            Value(0.0),
+        ),
+        **{field: count(rating=star) for star, field in STAR_FIELDS.items()},
+    )
+    if updated:
+        bump_generation_on_commit(CATALOG_GENERATION)
+    return updated
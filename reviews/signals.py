@@ -0,0 +1,49 @@
+from collections import Counter
+
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .models import Review
+from .ratings import apply_rating_delta, rating_contribution
+
+# Поля відгуку, від яких залежать агрегати рейтингу товару
+RATING_FIELDS = {'product', 'rating', 'is_active'}
+
+
+def _merge(target, contribution, sign):
+    for product_id, stars in contribution.items():
+        counter = target.setdefault(product_id, Counter())
+        for star, n in stars.items():
+            counter[star] += sign * n
+
+
+@receiver(pre_save, sender=Review)
+def remember_rating_state(sender, instance, update_fields=None, **kwargs):
+    instance._rating_before = {}
+    if instance.pk is None:
+        return
+    if update_fields is not None and not RATING_FIELDS.intersection(update_fields):
+        instance._rating_before = None
+        return
+    old = Review.objects.filter(pk=instance.pk).values('product_id', 'rating', 'is_active').first()
+    if old:
+        instance._rating_before = rating_contribution(old['product_id'], old['rating'], old['is_active'])
+
+
+@receiver(post_save, sender=Review)
+def update_product_rating(sender, instance, **kwargs):
+    before = getattr(instance, '_rating_before', {})
+    if before is None:
+        return
+    deltas = {}
+    _merge(deltas, before, -1)
+    _merge(deltas, rating_contribution(instance.product_id, instance.rating, instance.is_active), 1)
+    for product_id, stars in deltas.items():
+        apply_rating_delta(product_id, stars)
+
+
+@receiver(post_delete, sender=Review)
+def remove_product_rating(sender, instance, **kwargs):
+    contribution = rating_contribution(instance.product_id, instance.rating, instance.is_active)
+    for product_id, stars in contribution.items():
+        apply_rating_delta(product_id, {star: -n for star, n in stars.items()})
@@ -1,3 +1,74 @@
+from decimal import Decimal
+
+from django.contrib.auth.models import User
 from django.test import TestCase
 
-# Create your tests here.
+from main.models import Category, Product
+from .models import Review
+from .ratings import recompute_ratings
+
+
+class RatingAggregateTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name='Тест', slug='test')
+        cls.first, cls.second = (
+            Product.objects.create(
+                category=category, name=f'Товар {i}', slug=f'product-{i}', description='-',
+                price=Decimal('10.00'), effective_price=Decimal('10.00'),
+            )
+            for i in range(2)
+        )
+        cls.users = [User.objects.create_user(f'user{i}') for i in range(3)]
+
+    def _review(self, user, rating, product=None):
+        return Review.objects.create(
+            product=product or self.first, author=user, rating=rating, title='-', content='-',
+        )
+
+    def _aggregates(self, product):
+        product.refresh_from_db()
+        return product.rating_count, product.get_average_rating(), product.get_rating_distribution()
+
+    def test_signals_follow_create_edit_and_delete(self):
+        review = self._review(self.users[0], 5)
+        self._review(self.users[1], 2)
+        self.assertEqual(self._aggregates(self.first), (2, 3.5, {1: 0, 2: 1, 3: 0, 4: 0, 5: 1}))
+
+        review.rating = 4
+        review.save()
+        self.assertEqual(self._aggregates(self.first), (2, 3.0, {1: 0, 2: 1, 3: 0, 4: 1, 5: 0}))
+
+        review.delete()
+        self.assertEqual(self._aggregates(self.first), (1, 2.0, {1: 0, 2: 1, 3: 0, 4: 0, 5: 0}))
+
+    def test_inactive_and_moved_reviews(self):
+        review = self._review(self.users[0], 5)
+
+        review.is_active = False
+        review.save()
+        self.assertEqual(self._aggregates(self.first)[:2], (0, 0))
+
+        review.is_active = True
+        review.product = self.second
+        review.save()
+        self.assertEqual(self._aggregates(self.first)[:2], (0, 0))
+        self.assertEqual(self._aggregates(self.second)[:2], (1, 5.0))
+
+    def test_save_without_rating_fields_skips_update(self):
+        review = self._review(self.users[0], 3)
+        review.helpful_count = 7
+        # ні SELECT старого стану, ні UPDATE товару — лише UPDATE самого відгуку
+        with self.assertNumQueries(1):
+            review.save(update_fields=['helpful_count'])
+
+    def test_recompute_restores_aggregates_after_bulk_update(self):
+        for user, rating in zip(self.users, (1, 4, 4)):
+            self._review(user, rating)
+        # масова зміна в обхід сигналів
+        Review.objects.filter(rating=1).update(is_active=False)
+
+        self.assertEqual(recompute_ratings([self.first.pk]), 1)
+
+        self.assertEqual(self._aggregates(self.first), (2, 4.0, {1: 0, 2: 0, 3: 0, 4: 2, 5: 0}))
+        self.assertEqual(self._aggregates(self.second)[:2], (0, 0))